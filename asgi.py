@@ -0,0 +1,242 @@
+"""
+Production ASGI entry point.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 81 --workers 1
+
+`python main.py` still starts Flask's debug server for development.
+
+Worker and thread configuration
+-------------------------------
+* Run ONE server process (--workers 1). The leaderboard cache, the SSE
+  broker and the scoring dispatcher live in process memory; a second
+  process would serve its own stale leaderboard and miss events.
+* ASGI_THREADS (default 32) threads run the Flask views. Views only do
+  cheap work (session lookup, cached leaderboard, queue insert), so this
+  bounds concurrent requests, not CPU use.
+* SCORING_WORKERS (default: CPU count) processes do the scoring itself,
+  outside the server process (see scoring_queue.py).
+* Request bodies are received on the event loop and spooled to a
+  temporary file, so a slow upload never holds a view thread. Bodies
+  over MAX_UPLOAD_BYTES get a 413 before any view runs.
+* /events is served on the event loop: an open live-updates tab costs an
+  asyncio queue, not a thread.
+
+Compare against the dev server with benchmarks/bench_serving.py.
+"""
+
+import os
+import sys
+import queue
+import asyncio
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from main import app as flask_app, scoring
+from events import broker, HEARTBEAT_SECONDS, SUBSCRIBER_BACKLOG
+from upload_guard import MAX_UPLOAD_BYTES, upload_metrics
+
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))
+# Request bodies up to this size stay in memory while spooling
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+class AsyncSubscriber:
+    """Broker subscriber that wakes an asyncio task
+
+    EventBroker.publish runs on whichever thread scored or changed
+    something. Messages are buffered under a lock and the event loop is
+    woken once per batch rather than once per message; a full backlog
+    raises queue.Full, so slow clients are dropped like any subscriber.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup_sent = False
+        self._ready = asyncio.Event()
+
+    def put_nowait(self, message):
+        with self._lock:
+            if len(self._pending) >= SUBSCRIBER_BACKLOG:
+                raise queue.Full
+            self._pending.append(message)
+            wake, self._wakeup_sent = not self._wakeup_sent, True
+        if wake:
+            self.loop.call_soon_threadsafe(self._ready.set)
+
+    async def drain(self, timeout):
+        """Every message buffered so far as one string ('' on a spurious wakeup)"""
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        with self._lock:
+            messages, self._pending = self._pending, []
+            self._wakeup_sent = False
+            self._ready.clear()
+        return ''.join(messages)
+
+
+class ASGIApp:
+    """Serves the Flask app over ASGI without blocking the event loop"""
+
+    def __init__(self, wsgi_app, threads=ASGI_THREADS):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi-view')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] != 'http':
+            return
+        elif scope['path'] == '/events':
+            await self.events(receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Start the scoring pool before the first upload, not during it
+                await asyncio.get_running_loop().run_in_executor(self.executor, scoring.start)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def events(self, receive, send):
+        """Same stream as main.events(), one asyncio task per client"""
+        subscriber = broker.subscribe(AsyncSubscriber(asyncio.get_running_loop()))
+        disconnected = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+            await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+            while not disconnected.done():
+                try:
+                    message = await subscriber.drain(HEARTBEAT_SECONDS)
+                    if not message:
+                        continue
+                except asyncio.TimeoutError:
+                    if not broker.is_subscribed(subscriber):
+                        # Dropped for falling behind; end the stream so the browser reconnects
+                        break
+                    message = ": keep-alive\n\n"
+                await send({'type': 'http.response.body', 'body': message.encode('utf-8'), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        except OSError:
+            pass
+        finally:
+            broker.unsubscribe(subscriber)
+            disconnected.cancel()
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def wsgi(self, scope, receive, send):
+        headers = {}
+        for name, value in scope['headers']:
+            name = name.decode('latin-1')
+            value = value.decode('latin-1')
+            separator = '; ' if name == 'cookie' else ','
+            headers[name] = f"{headers[name]}{separator}{value}" if name in headers else value
+
+        declared = headers.get('content-length')
+        if declared and declared.isdigit() and int(declared) > MAX_UPLOAD_BYTES:
+            return await self._too_large(send)
+
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        received = 0
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                chunk = message.get('body', b'')
+                received += len(chunk)
+                if received > MAX_UPLOAD_BYTES:
+                    return await self._too_large(send)
+                body.write(chunk)
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+
+            environ = self._environ(scope, headers, body, received)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._run_view, environ, loop, send)
+        finally:
+            body.close()
+
+    async def _too_large(self, send):
+        upload_metrics.record(0.0, 'too_large')
+        await send({'type': 'http.response.start', 'status': 413,
+                    'headers': [(b'content-type', b'text/plain; charset=utf-8'), (b'connection', b'close')]})
+        await send({'type': 'http.response.body',
+                    'body': f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB".encode('utf-8')})
+
+    @staticmethod
+    def _environ(scope, headers, body, length):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'CONTENT_LENGTH': str(length),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers.items():
+            if name == 'content-type':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'content-length':
+                environ['HTTP_' + name.upper().replace('-', '_')] = value
+        return environ
+
+    def _run_view(self, environ, loop, send):
+        """Run the Flask view on a pool thread, forwarding its output to the loop"""
+        def forward(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response_headers]
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            started = False
+            for chunk in result:
+                if not started:
+                    forward({'type': 'http.response.start', 'status': response['status'],
+                             'headers': response['headers']})
+                    started = True
+                if chunk:
+                    forward({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                forward({'type': 'http.response.start', 'status': response['status'],
+                         'headers': response['headers']})
+            forward({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+
+app = ASGIApp(flask_app)
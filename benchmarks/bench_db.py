@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the SQLite layer.
+
+Runs concurrent leaderboard readers alongside submission writers against a
+scratch database, once with the old per-request connections in rollback
+journal mode and once with db.py's pooled WAL connections, and reports
+throughput, latency and "database is locked" errors for both.
+
+    python benchmarks/bench_db.py --readers 60 --writers 8 --seconds 10
+"""
+
+import os
+import sys
+import time
+import uuid
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from migrations import migrate
+from bug_rules import BugResult, ScoreResult
+
+
+def make_database(path, teams):
+    migrate(path)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO teams (name, password, site_id) VALUES (?, ?, ?)",
+                     [(f"team{i}", "pw", i % 5 + 1) for i in range(teams)])
+    conn.commit()
+    conn.close()
+
+
+def fake_result(site_id, rnd_fixed):
+    bugs = tuple(BugResult(f"HTML-{i:03d}", "index.html", "bug", "easy", i < rnd_fixed, 10 if i < rnd_fixed else 0)
+                 for i in range(30))
+    return ScoreResult(site_id, rnd_fixed * 10, 30, rnd_fixed, bugs, {"index.html": "0" * 64}, "bench", 1.0)
+
+
+def legacy_read(path):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute(db.SELECT_LEADERBOARD)
+    c.fetchall()
+    conn.close()
+
+
+def legacy_write(path, job, result):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    # Same read-then-write sequence index() used before db.py
+    c.execute("SELECT id FROM scores WHERE name=?", (job['team'],))
+    if c.fetchone():
+        c.execute("UPDATE scores SET score=?, duration=?, site_id=? WHERE name=?",
+                  (result.score, job['time_taken'], job['site_id'], job['team']))
+    else:
+        c.execute("INSERT INTO scores (name, score, duration, site_id) VALUES (?, ?, ?, ?)",
+                  (job['team'], result.score, job['time_taken'], job['site_id']))
+    c.execute(db.INSERT_SUBMISSION, (job['id'], job['team'], job['site_id'], result.score, result.fixed_bugs,
+                                     result.total_bugs, job['time_taken'], result.plan_version, "{}",
+                                     result.elapsed_ms, "now"))
+    c.executemany(db.INSERT_BUG_RESULT, [(job['id'], bug.bug_id, job['site_id'], int(bug.fixed), bug.points)
+                                        for bug in result.bugs])
+    conn.commit()
+    conn.close()
+
+
+def pooled_read(path):
+    db.get_leaderboard_rows()
+
+
+def pooled_write(path, job, result):
+    db.save_submission(job, result)
+
+
+def run(mode, path, readers, writers, seconds, teams):
+    read, write = (legacy_read, legacy_write) if mode == 'legacy' else (pooled_read, pooled_write)
+    stop = time.perf_counter() + seconds
+    stats = {'read': [], 'write': [], 'locked': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def reader():
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            try:
+                read(path)
+                with lock:
+                    stats['read'].append(time.perf_counter() - started)
+            except sqlite3.Error as e:
+                with lock:
+                    stats['locked' if db.is_locked_error(e) else 'errors'] += 1
+            finally:
+                db.release_thread()
+            time.sleep(0.005)
+
+    def writer(n):
+        i = 0
+        while time.perf_counter() < stop:
+            i += 1
+            job = {'id': uuid.uuid4().hex, 'team': f"team{(n * 7 + i) % teams}", 'site_id': n % 5 + 1,
+                   'time_taken': i}
+            started = time.perf_counter()
+            try:
+                write(path, job, fake_result(job['site_id'], i % 31))
+                with lock:
+                    stats['write'].append(time.perf_counter() - started)
+            except sqlite3.Error as e:
+                with lock:
+                    stats['locked' if db.is_locked_error(e) else 'errors'] += 1
+            finally:
+                db.release_thread()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=60)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--teams', type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'reads/s':>9} {'writes/s':>9} {'read p95':>10} {'write p95':>10} {'locked':>7} {'errors':>7}")
+    for mode in ('legacy', 'pooled'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            make_database(path, args.teams)
+            db.DATABASE = path
+            db.invalidate()
+            stats = run(mode, path, args.readers, args.writers, args.seconds, args.teams)
+        print(f"{mode:<8} {len(stats['read']) / args.seconds:>9.0f} {len(stats['write']) / args.seconds:>9.0f} "
+              f"{percentile(stats['read'], 95):>8.1f}ms {percentile(stats['write'], 95):>8.1f}ms "
+              f"{stats['locked']:>7} {stats['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
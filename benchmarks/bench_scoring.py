@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the bug_rules scoring engine.
+
+Times verify_specific_bugs, check_all_fixes and get_detailed_results on
+synthetic HTML/CSS from 4 KB to 5 MB, for every site's bug log, with every
+bug fixed and with none fixed. The score cache is cleared before each call,
+so check_all_fixes and get_detailed_results are measured cold.
+
+    python benchmarks/bench_scoring.py run --output bench_scoring.json
+    python benchmarks/bench_scoring.py run --baseline old.json --threshold 20
+    python benchmarks/bench_scoring.py compare old.json new.json
+
+`run --baseline` and `compare` exit with status 1 when any case's median
+is more than --threshold percent slower than the baseline.
+
+--engine picks the scoring engine; to check that the structural engine
+stays within 2x of substring scans:
+
+    python benchmarks/bench_scoring.py run --engine substring --output substring.json
+    python benchmarks/bench_scoring.py run --engine structural --baseline substring.json --threshold 100
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bug_plan
+import bug_rules
+from bug_plan import SUBMISSION_FILES, ENGINES
+from score_cache import score_cache
+
+SIZES = {'4KB': 4 * 1024, '64KB': 64 * 1024, '1MB': 1024 * 1024, '5MB': 5 * 1024 * 1024}
+SITES = (1, 2, 3, 4, 5)
+VARIANTS = ('fixed', 'unfixed')
+FUNCTIONS = ('verify_specific_bugs', 'check_all_fixes', 'get_detailed_results')
+DEFAULT_THRESHOLD = 20.0
+
+# Neutral markup repeated to pad inputs; contains no bug snippets of its own
+HTML_FILLER = ('<div class="row"><div class="col-md-6"><p class="text-muted">Lorem ipsum dolor sit amet, '
+               'consectetur adipiscing elit.</p><a href="#" class="btn btn-primary">Read more</a></div></div>\n')
+CSS_FILLER = '.card-item { margin: 0 auto; padding: 12px 16px; border-radius: 4px; line-height: 1.5; }\n'
+
+
+def synthetic_file(bugs, fixed, size, filler):
+    """Every bug's original (fixed) or modified snippet, padded to `size` bytes"""
+    snippets = '\n'.join(bug['original'] if fixed else bug['modified'] for bug in bugs)
+    padding = max(0, size - len(snippets))
+    text = filler * (padding // len(filler) + 1)
+    # Snippets go in the middle so checks cannot stop at the start of the file
+    half = padding // 2
+    return text[:half] + snippets + text[half:padding]
+
+
+def synthetic_contents(site_id, fixed, size):
+    bugs = bug_rules.load_bug_log(site_id)['bugs']
+    html_bugs = [bug for bug in bugs if bug['id'].startswith('HTML')]
+    css_bugs = [bug for bug in bugs if bug['id'].startswith('CSS')]
+    return {
+        SUBMISSION_FILES['HTML']: synthetic_file(html_bugs, fixed, size, HTML_FILLER),
+        SUBMISSION_FILES['CSS']: synthetic_file(css_bugs, fixed, size, CSS_FILLER),
+    }, html_bugs, css_bugs
+
+
+def write_folder(folder, contents):
+    for name, text in contents.items():
+        path = os.path.join(folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def time_call(fn, min_rounds, min_time):
+    """Per-call timings in seconds: at least min_rounds calls and min_time total"""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_rounds or time.perf_counter() - started < min_time:
+        score_cache.clear()
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+        if len(timings) >= 1000:
+            break
+    return timings
+
+
+def run_cases(args):
+    sizes = args.sizes.split(',')
+    sites = [int(s) for s in args.sites.split(',')]
+    functions = args.functions.split(',')
+    bug_plan.SCORING_ENGINE = args.engine
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for site_id in sites:
+            bug_rules.get_site_plan(site_id)
+            for variant in VARIANTS:
+                for size_name in sizes:
+                    contents, html_bugs, css_bugs = synthetic_contents(site_id, variant == 'fixed', SIZES[size_name])
+                    folder = os.path.join(tmp, f'site_{site_id}_{variant}_{size_name}')
+                    write_folder(folder, contents)
+                    html, css = contents[SUBMISSION_FILES['HTML']], contents[SUBMISSION_FILES['CSS']]
+                    calls = {
+                        'verify_specific_bugs': lambda: (bug_rules.verify_specific_bugs(html, html_bugs),
+                                                         bug_rules.verify_specific_bugs(css, css_bugs)),
+                        'check_all_fixes': lambda: bug_rules.check_all_fixes(folder, site_id),
+                        'get_detailed_results': lambda: bug_rules.get_detailed_results(folder, site_id),
+                    }
+                    for name in functions:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            timings = time_call(calls[name], args.min_rounds, args.min_time)
+                        key = f"{name}/site{site_id}/{variant}/{size_name}"
+                        results[key] = {
+                            'rounds': len(timings),
+                            'min_ms': min(timings) * 1000,
+                            'median_ms': statistics.median(timings) * 1000,
+                            'mean_ms': statistics.fmean(timings) * 1000,
+                            'stdev_ms': statistics.pstdev(timings) * 1000,
+                        }
+                        print(f"{key:<48} {results[key]['median_ms']:10.3f} ms  ({len(timings)} rounds)")
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """Print per-case median changes; returns the keys slower than threshold percent"""
+    regressions = []
+    print(f"{'case':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key in sorted(set(baseline) | set(current)):
+        if key not in baseline or key not in current:
+            print(f"{key:<48} {'only in ' + ('current' if key in current else 'baseline'):>30}")
+            continue
+        old, new = baseline[key]['median_ms'], current[key]['median_ms']
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(key)
+            flag = ' ❌'
+        print(f"{key:<48} {old:>8.3f}ms {new:>8.3f}ms {change:>+7.1f}%{flag}")
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) regressed by more than {threshold:.0f}%")
+    else:
+        print(f"✅ No case regressed by more than {threshold:.0f}%")
+    return regressions
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks and store the results as JSON')
+    run.add_argument('--output', default='bench_scoring.json')
+    run.add_argument('--baseline', help='results file to check for regressions')
+    run.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed slowdown in percent')
+    run.add_argument('--sizes', default=','.join(SIZES))
+    run.add_argument('--sites', default=','.join(map(str, SITES)))
+    run.add_argument('--functions', default=','.join(FUNCTIONS))
+    run.add_argument('--engine', choices=ENGINES, default=bug_plan.SCORING_ENGINE)
+    run.add_argument('--min-rounds', type=int, default=5)
+    run.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per case')
+
+    diff = commands.add_parser('compare', help='diff two results files')
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    diff.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        sys.exit(1 if compare(load_results(args.baseline), load_results(args.current), args.threshold) else 0)
+
+    results = run_cases(args)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'revision': git_revision(),
+                'engine': args.engine,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'min_rounds': args.min_rounds,
+                'min_time': args.min_time,
+            },
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        sys.exit(1 if compare(load_results(args.baseline), results, args.threshold) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Load test: Flask's debug server (python main.py) vs the ASGI entry point.
+
+Each mode runs against its own scratch copy of the app with a fresh
+database and a running event clock. Leaderboard pollers, open /events
+streams and team uploads run concurrently, and latency, throughput and
+errors are reported per request type.
+
+    python benchmarks/bench_serving.py --pollers 40 --sse 60 --submitters 6 --seconds 15
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import datetime
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Teams created by reset_db.py
+TEAMS = [("TeamAlpha", "alpha123"), ("BugSquashers", "squash404"), ("ErrorHunters", "error007"),
+         ("NullPointers", "nullnull"), ("alpha", "bug123"), ("beta", "fix456"), ("gamma", "patch789")]
+
+SERVERS = {
+    'dev': lambda port: [sys.executable, '-c',
+                         "import main; main.app.run(debug=True, use_reloader=False, "
+                         f"host='127.0.0.1', port={port})"],
+    'asgi': lambda port: [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1',
+                          '--port', str(port), '--workers', '1', '--log-level', 'warning'],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def scratch_copy(tmp, minutes=60):
+    """Copy the app into tmp with a fresh database and a running clock"""
+    workdir = os.path.join(tmp, 'app')
+    shutil.copytree(ROOT, workdir, ignore=shutil.ignore_patterns(
+        '.git', '__pycache__', 'uploads', 'build', '*.db', '*.db-wal', '*.db-shm'))
+    subprocess.run([sys.executable, 'reset_db.py'], cwd=workdir, check=True, stdout=subprocess.DEVNULL)
+    with open(os.path.join(workdir, 'admin', 'status.json'), 'w') as f:
+        json.dump({"status": "running", "start_time": datetime.now().isoformat(), "duration": minutes}, f)
+    return workdir
+
+
+class Server:
+    """A server process running from a scratch copy, stopped on exit"""
+
+    def __init__(self, mode, workdir, env=None):
+        self.port = free_port()
+        self.log = open(os.path.join(workdir, 'server.log'), 'w')
+        self.process = subprocess.Popen(SERVERS[mode](self.port), cwd=workdir, stdout=self.log,
+                                        stderr=subprocess.STDOUT, env=dict(os.environ, **(env or {})))
+
+    def __enter__(self):
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=1):
+                    return self
+            except OSError:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"server exited with {self.process.returncode}, see {self.log.name}")
+                time.sleep(0.2)
+        raise RuntimeError("server did not start")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+class Client:
+    """Keep-alive HTTP client with a cookie jar of one session cookie"""
+
+    def __init__(self, port, timeout=30):
+        self.port = port
+        self.timeout = timeout
+        self.cookie = None
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # Server closed an idle keep-alive connection; retry once on a new one
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    raise
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            self.cookie = cookie.split(';', 1)[0]
+        return response.status, data
+
+    def login(self, name, password):
+        body = urlencode({'username': name, 'password': password})
+        status, _ = self.request('POST', '/login', body,
+                                 {'Content-Type': 'application/x-www-form-urlencoded'})
+        if status != 302:
+            raise RuntimeError(f"login failed for {name}: {status}")
+
+    def upload(self, data, filename='submission.zip'):
+        boundary = uuid.uuid4().hex
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="zipfile"; filename="{filename}"\r\n'
+                f'Content-Type: application/zip\r\n\r\n').encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+        return self.request('POST', '/', body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+
+def submission_zip(site_id):
+    """The site's bugged files laid out as a team would upload them"""
+    import io
+    import zipfile
+    from bug_plan import SUBMISSION_FILES
+    site = os.path.join(ROOT, 'templates', 'bugged_sites', f'site_{site_id}')
+    css = [name for name in sorted(os.listdir(site)) if name.endswith('.css')]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.write(os.path.join(site, 'index.html'), SUBMISSION_FILES['HTML'])
+        if css:
+            zf.write(os.path.join(site, css[0]), SUBMISSION_FILES['CSS'])
+    return buf.getvalue()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000
+
+
+def sse_listener(port, stop, counts, lock):
+    """Hold one /events stream open and count the events it receives"""
+    try:
+        sock = socket.create_connection(('127.0.0.1', port), timeout=2)
+        sock.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+        with lock:
+            counts['connected'] += 1
+        while not stop.is_set():
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not chunk:
+                break
+            with lock:
+                counts['events'] += chunk.count(b'\nevent: ')
+        sock.close()
+    except OSError:
+        with lock:
+            counts['failed'] += 1
+
+
+def run(mode, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = scratch_copy(tmp)
+        with Server(mode, workdir) as server:
+            stop = threading.Event()
+            deadline = time.perf_counter() + args.seconds
+            stats = {'leaderboard': [], 'upload': [], 'errors': 0}
+            sse = {'connected': 0, 'events': 0, 'failed': 0}
+            lock = threading.Lock()
+
+            def record(kind, call):
+                started = time.perf_counter()
+                try:
+                    ok = call()
+                except OSError:
+                    ok = False
+                with lock:
+                    if ok:
+                        stats[kind].append(time.perf_counter() - started)
+                    else:
+                        stats['errors'] += 1
+
+            def poller():
+                client = Client(server.port)
+                while time.perf_counter() < deadline:
+                    record('leaderboard', lambda: client.request('GET', '/leaderboard')[0] == 200)
+                    time.sleep(args.poll_interval)
+
+            def submitter(n):
+                name, password = TEAMS[n % len(TEAMS)]
+                client = Client(server.port)
+                client.login(name, password)
+                payload = submission_zip(n % 5 + 1)
+                while time.perf_counter() < deadline:
+                    record('upload', lambda: client.upload(payload)[0] == 200)
+
+            listeners = [threading.Thread(target=sse_listener, args=(server.port, stop, sse, lock))
+                         for _ in range(args.sse)]
+            workers = [threading.Thread(target=poller) for _ in range(args.pollers)]
+            workers += [threading.Thread(target=submitter, args=(n,)) for n in range(args.submitters)]
+            for t in listeners + workers:
+                t.start()
+            for t in workers:
+                t.join()
+            stop.set()
+            for t in listeners:
+                t.join()
+            return stats, sse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='dev,asgi')
+    parser.add_argument('--pollers', type=int, default=40)
+    parser.add_argument('--poll-interval', type=float, default=0.05)
+    parser.add_argument('--sse', type=int, default=60)
+    parser.add_argument('--submitters', type=int, default=6)
+    parser.add_argument('--seconds', type=float, default=15)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'lb req/s':>9} {'lb p50':>8} {'lb p95':>8} {'uploads/s':>10} {'up p50':>8} "
+          f"{'up p95':>8} {'errors':>7} {'sse open':>9} {'events':>7}")
+    for mode in args.modes.split(','):
+        stats, sse = run(mode, args)
+        lb, up = stats['leaderboard'], stats['upload']
+        print(f"{mode:<6} {len(lb) / args.seconds:>9.0f} {percentile(lb, 50):>6.1f}ms {percentile(lb, 95):>6.1f}ms "
+              f"{len(up) / args.seconds:>10.1f} {percentile(up, 50):>6.1f}ms {percentile(up, 95):>6.1f}ms "
+              f"{stats['errors'] + sse['failed']:>7} {sse['connected']:>4}/{args.sse:<4} {sse['events']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+End-of-event burst: how many concurrent submissions does the system survive?
+
+Starts a local server from a scratch copy, imports N teams through the admin
+dashboard's bulk_teams CSV upload, then has every team submit at once while
+spectators poll the leaderboard. Each submission is built from the site's
+templates/bugged_sites files plus the original or modified snippet of every
+hardcoded bug, chosen at random, so each one fixes a different subset.
+
+Reports upload and time-to-score latency (p50/p95/p99), throughput, error
+rates, and scoring correctness: every score the server reports is compared
+with verify_specific_bugs run locally on the same files.
+
+    python benchmarks/bench_submissions.py --teams 60 --rounds 3 --pollers 20 --mode asgi
+"""
+
+import io
+import os
+import re
+import json
+import sys
+import time
+import random
+import zipfile
+import argparse
+import tempfile
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_serving import Client, Server, SERVERS, scratch_copy, percentile, ROOT
+from bug_plan import SUBMISSION_FILES, bug_file
+from bug_rules import load_bug_log, verify_specific_bugs
+
+SUBMISSION_ID_RE = re.compile(r"/submission/([^/']+)/status")
+
+
+def site_sources(site_id):
+    """Base (html, css) for a site from templates/bugged_sites"""
+    folder = os.path.join(ROOT, 'templates', 'bugged_sites', f'site_{site_id}')
+    with open(os.path.join(folder, 'index.html'), encoding='utf-8') as f:
+        html = f.read()
+    css = ''
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.css'):
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                css = f.read()
+            break
+    return html, css
+
+
+def build_submission(site_id, rng, sources):
+    """(ZIP bytes, contents) for one submission with a random subset of bugs fixed"""
+    html, css = sources[site_id]
+    contents = {SUBMISSION_FILES['HTML']: [html], SUBMISSION_FILES['CSS']: [css]}
+    for bug in load_bug_log(site_id)['bugs']:
+        file = bug_file(bug)
+        contents.setdefault(file, [])
+        if rng.random() < 0.5:
+            contents[file].append(bug['original'])
+        else:
+            contents[file].append(bug['modified'])
+    contents = {file: '\n'.join(parts) for file, parts in contents.items()}
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for file, text in contents.items():
+            zf.writestr(file, text)
+    return buf.getvalue(), contents
+
+
+def expected_score(site_id, contents):
+    """Reference score from the unoptimised verify_specific_bugs"""
+    bugs = load_bug_log(site_id)['bugs']
+    score = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file in dict.fromkeys(map(bug_file, bugs)):
+            file_bugs = [bug for bug in bugs if bug_file(bug) == file]
+            score += verify_specific_bugs(contents.get(file, ''), file_bugs)[0]
+    return score
+
+
+def import_teams(port, teams):
+    admin = Client(port)
+    admin.login('admin', 'admin')
+    csv_text = ''.join(f"{name},{password},{site_id}\n" for name, password, site_id in teams)
+    boundary = 'benchteams'
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="action"\r\n\r\nbulk_teams\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="teams.csv"\r\n'
+            f'Content-Type: text/csv\r\n\r\n{csv_text}\r\n--{boundary}--\r\n').encode('utf-8')
+    status, page = admin.request('POST', '/admin/dashboard', body,
+                                 {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    imported = re.search(rb'(\d+) team\(s\) imported', page)
+    if status != 200 or not imported or int(imported.group(1)) != len(teams):
+        raise RuntimeError(f"bulk_teams import failed ({status}): {imported and imported.group(0)}")
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    teams = [(f"load{n:03d}", f"pw{n:03d}", n % 5 + 1) for n in range(args.teams)]
+    sources = {site_id: site_sources(site_id) for site_id in range(1, 6)}
+    # Built up front so the burst measures the server, not the ZIP writer
+    plans = {name: [build_submission(site_id, rng, sources) for _ in range(args.rounds)]
+             for name, _, site_id in teams}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = scratch_copy(tmp)
+        with Server(args.mode, workdir) as server:
+            import_teams(server.port, teams)
+
+            lock = threading.Lock()
+            stats = {'upload': [], 'scored': [], 'leaderboard': [], 'upload_errors': 0,
+                     'score_errors': 0, 'poll_errors': 0, 'correct': 0, 'wrong': []}
+            submitted = []
+            start_gate = threading.Barrier(args.teams + 1)
+            burst_done = threading.Event()
+
+            def team(name, password, site_id):
+                client = Client(server.port)
+                client.login(name, password)
+                start_gate.wait()
+                for payload, contents in plans[name]:
+                    started = time.perf_counter()
+                    try:
+                        status, page = client.upload(payload)
+                        match = SUBMISSION_ID_RE.search(page.decode('utf-8', 'replace'))
+                    except OSError:
+                        status, match = None, None
+                    with lock:
+                        if status == 200 and match:
+                            stats['upload'].append(time.perf_counter() - started)
+                            submitted.append((client, match.group(1), site_id, contents, started))
+                        else:
+                            stats['upload_errors'] += 1
+
+            def poller():
+                client = Client(server.port)
+                while not burst_done.is_set():
+                    started = time.perf_counter()
+                    try:
+                        ok = client.request('GET', '/leaderboard.json')[0] == 200
+                    except OSError:
+                        ok = False
+                    with lock:
+                        if ok:
+                            stats['leaderboard'].append(time.perf_counter() - started)
+                        else:
+                            stats['poll_errors'] += 1
+                    time.sleep(args.poll_interval)
+
+            threads = [threading.Thread(target=team, args=t) for t in teams]
+            pollers = [threading.Thread(target=poller) for _ in range(args.pollers)]
+            for t in threads + pollers:
+                t.start()
+            start_gate.wait()
+            burst_started = time.perf_counter()
+            for t in threads:
+                t.join()
+            uploads_finished = time.perf_counter()
+
+            # Wait for the scoring queue to drain; time-to-score is when the status first reads done
+            pending = list(submitted)
+            deadline = time.perf_counter() + args.score_timeout
+            while pending and time.perf_counter() < deadline:
+                still_pending = []
+                for entry in pending:
+                    client, submission_id, site_id, contents, started = entry
+                    status, body = client.request('GET', f'/submission/{submission_id}/status')
+                    job = json.loads(body) if status == 200 else {}
+                    if job.get('status') == 'done':
+                        stats['scored'].append(time.perf_counter() - started)
+                        expected = expected_score(site_id, contents)
+                        if job['score'] == expected:
+                            stats['correct'] += 1
+                        else:
+                            stats['wrong'].append((submission_id, site_id, job['score'], expected))
+                    elif job.get('status') == 'failed' or status != 200:
+                        stats['score_errors'] += 1
+                    else:
+                        still_pending.append(entry)
+                pending = still_pending
+                if pending:
+                    time.sleep(0.1)
+            scoring_finished = time.perf_counter()
+            stats['score_errors'] += len(pending)
+
+            burst_done.set()
+            for t in pollers:
+                t.join()
+
+    stats['upload_seconds'] = uploads_finished - burst_started
+    stats['scoring_seconds'] = scoring_finished - burst_started
+    stats['attempted'] = args.teams * args.rounds
+    return stats
+
+
+def report(stats):
+    def line(label, values):
+        print(f"  {label:<14} n={len(values):<6} p50 {percentile(values, 50):8.1f}ms  "
+              f"p95 {percentile(values, 95):8.1f}ms  p99 {percentile(values, 99):8.1f}ms")
+
+    attempted = stats['attempted']
+    print("Latency")
+    line("upload", stats['upload'])
+    line("time-to-score", stats['scored'])
+    line("leaderboard", stats['leaderboard'])
+    print("Throughput")
+    print(f"  uploads accepted  {len(stats['upload']) / max(stats['upload_seconds'], 1e-9):8.1f}/s")
+    print(f"  submissions scored {len(stats['scored']) / max(stats['scoring_seconds'], 1e-9):7.1f}/s")
+    print("Errors")
+    print(f"  upload  {stats['upload_errors']}/{attempted} ({100 * stats['upload_errors'] / attempted:.1f}%)")
+    print(f"  scoring {stats['score_errors']}/{attempted} ({100 * stats['score_errors'] / attempted:.1f}%)")
+    print(f"  polling {stats['poll_errors']}/{len(stats['leaderboard']) + stats['poll_errors']}")
+    print("Correctness")
+    checked = stats['correct'] + len(stats['wrong'])
+    print(f"  {stats['correct']}/{checked} scores match verify_specific_bugs")
+    for submission_id, site_id, got, expected in stats['wrong'][:10]:
+        print(f"  ❌ {submission_id} (site {site_id}): server {got}, expected {expected}")
+    return not stats['wrong'] and not stats['upload_errors'] and not stats['score_errors']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=sorted(SERVERS), default='asgi')
+    parser.add_argument('--teams', type=int, default=60)
+    parser.add_argument('--rounds', type=int, default=3, help='submissions per team')
+    parser.add_argument('--pollers', type=int, default=20)
+    parser.add_argument('--poll-interval', type=float, default=0.2)
+    parser.add_argument('--score-timeout', type=float, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.teams} teams x {args.rounds} submissions against the {args.mode} server, "
+          f"{args.pollers} leaderboard pollers")
+    sys.exit(0 if report(run(args)) else 1)
+
+
+if __name__ == '__main__':
+    main()
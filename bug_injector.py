@@ -0,0 +1,324 @@
+"""Generate a bugged site and its bug pack from a clean template.
+
+    python bug_injector.py TEMPLATE_DIR OUT_DIR --site-id 6 --seed 42 [--html 15 --css 15] [--pack-dir bug_packs]
+
+Mutations are drawn from the bug types already used in the bug packs.
+Every mutation is checked before it is kept:
+
+* its original occurs exactly once in the clean file and its modified
+  text nowhere, growing the surrounding context until that holds, so
+  "modified not in content and original in content" can only be true
+  once that exact spot is repaired;
+* the bug's own checker (bug_plan.build_checker) says "not fixed" on the
+  bugged file, "fixed" on the clean file and "fixed" once only this bug
+  is reverted, so no two bugs depend on each other. This holds for the
+  substring, structural and normalized views alike.
+
+The same template, seed and counts always produce the same site.
+Placing 30 bugs takes 50-130ms on the bugged_sites templates and
+0.3-0.55s on a 39KB template, most of it building the structural and
+normalized views of each trial text once.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import shutil
+import argparse
+from collections import namedtuple
+
+from bug_plan import SUBMISSION_FILES, TextView, StructuralView, NormalizedView, build_checker
+from normalize import normalized_needles
+from bug_pack import make_pack, validate_pack, write_pack
+
+# How far a mutation may grow its context to become unique
+MAX_CONTEXT = 40
+
+# pattern: candidate originals; mutate(text, rng) -> modified text or None;
+# context: which side(s) may be extended to make the pair unique
+Mutator = namedtuple('Mutator', 'type prefix difficulty description pattern mutate context')
+
+OPEN_TAG = r'<(?:div|section|span|nav|footer|header|button|form|ul|li|p|a|h[1-6])\b[^<>\n]*>'
+
+
+def _swap_letters(word, rng):
+    positions = [i for i in range(len(word) - 1) if word[i] != word[i + 1] and word[i:i + 2].isalpha()]
+    if not positions:
+        return None
+    i = rng.choice(positions)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def _drop_letter(word, rng):
+    positions = [i for i in range(1, len(word)) if word[i].isalpha()]
+    if len(word) < 4 or not positions:
+        return None
+    i = rng.choice(positions)
+    return word[:i] + word[i + 1:]
+
+
+def _tag_typo(text, rng):
+    name = re.match(r'<(\w+)', text).group(1)
+    typo = _swap_letters(name, rng)
+    return typo and text.replace(name, typo, 1)
+
+
+def _property_typo(text, rng):
+    name, rest = text.split(':', 1)
+    typo = _drop_letter(name, rng)
+    return typo and f"{typo}:{rest}"
+
+
+MUTATORS = (
+    Mutator('tag_typo', 'HTML', 'medium', "Misspelled tag name", OPEN_TAG, _tag_typo, 'after'),
+    Mutator('missing_bracket', 'HTML', 'easy', "Missing closing > on tag", OPEN_TAG,
+            lambda text, rng: text[:-1], 'after'),
+    Mutator('extra_space', 'HTML', 'easy', "Space after < in tag", OPEN_TAG,
+            lambda text, rng: '< ' + text[1:], 'after'),
+    Mutator('broken_href', 'HTML', 'easy', "Broken anchor link", r'href="#[\w-]{3,}"',
+            lambda text, rng: text[:-2] + '"', 'after'),
+    Mutator('broken_comment', 'HTML', 'easy', "Malformed HTML comment", r'<!--[^\n<>]{3,}?-->',
+            lambda text, rng: '<!-' + text[4:], 'after'),
+    Mutator('invisible_char', 'HTML', 'hard', "Zero-width space between words",
+            r'(?<=>)[A-Z][a-z]+ [A-Za-z]+(?=[^<>]*<)', lambda text, rng: text.replace(' ', '\u200b', 1), 'after'),
+    Mutator('nested_mismatch', 'HTML', 'medium', "Mismatched closing tag",
+            r'<(h[1-6]|p|span|a)\b[^<>]*>[^<>\n]{1,80}</\1>',
+            lambda text, rng: text[:text.rindex('</')] + '</div>', 'after'),
+    Mutator('missing_closing_tag', 'HTML', 'medium', "Missing closing tag", r'</(?:h[1-6]|p|span|button|li)>',
+            lambda text, rng: '', 'both'),
+
+    Mutator('property_typo', 'CSS', 'medium', "Misspelled property name", r'(?<![\w-])[a-z][a-z-]{4,}:(?!:)',
+            _property_typo, 'after'),
+    Mutator('missing_colon', 'CSS', 'easy', "Missing colon after property", r'(?<![\w-])[a-z][a-z-]{2,}:(?=\s*[^\s;{}])',
+            lambda text, rng: text[:-1] + ' ', 'after'),
+    Mutator('missing_semicolon', 'CSS', 'easy', "Missing semicolon", r'(?<![\w-])[a-z-]+:\s*[^;{}\n]+;',
+            lambda text, rng: text[:-1], 'before'),
+    Mutator('missing_bracket', 'CSS', 'medium', "Missing opening brace", r'[.#]?[\w-][\w .#:>-]*\s*\{',
+            lambda text, rng: text[:-1], 'after'),
+    Mutator('invalid_unit', 'CSS', 'easy', "Invalid unit", r'(?<![\w.-])\d+(?:\.\d+)?px\b',
+            lambda text, rng: text[:-2] + 'pix', 'after'),
+    Mutator('invalid_percentage', 'CSS', 'easy', "Invalid percentage", r'(?<![\w.-])\d+%',
+            lambda text, rng: text[:-1] + 'percent', 'after'),
+    Mutator('media_query_typo', 'CSS', 'medium', "Misspelled @media", r'@media\b[^{\n]*',
+            lambda text, rng: '@mdia' + text[6:], 'after'),
+    Mutator('pseudo_class_typo', 'CSS', 'medium', "Misspelled pseudo-class", r':(?:hover|focus|active|before|after)\b',
+            lambda text, rng: text[:-1], 'after'),
+    Mutator('important_typo', 'CSS', 'easy', "Misspelled !important", r'!important',
+            lambda text, rng: text[:-1], 'after'),
+    Mutator('invalid_variable', 'CSS', 'medium', "Undefined CSS variable", r'var\(--[\w-]+\)',
+            lambda text, rng: text[:-1] + 'G)', 'after'),
+    Mutator('variable_syntax', 'CSS', 'hard', "Single dash in var()", r'var\(--[\w-]+\)',
+            lambda text, rng: 'var(-' + text[6:], 'after'),
+)
+
+GeneratedBug = namedtuple('GeneratedBug', 'bug start end')
+InjectionResult = namedtuple('InjectionResult', 'files pack seconds')
+
+
+class InjectionError(ValueError):
+    """The template does not offer enough sound mutations"""
+
+
+def _candidates(mutator, text, rng):
+    """Shuffled (start, end, original, modified) candidates made unique in `text`"""
+    matches = list(re.finditer(mutator.pattern, text))
+    rng.shuffle(matches)
+    for match in matches:
+        modified = mutator.mutate(match.group(0), rng)
+        if modified is None or modified == match.group(0):
+            continue
+        start, end = match.span()
+        head, tail = 0, 0
+        while True:
+            original = text[start - head:end + tail]
+            candidate = text[start - head:start] + modified + text[end:end + tail]
+            if text.count(original) == 1 and candidate not in text:
+                yield start - head, end + tail, original, candidate
+                break
+            grow_before = mutator.context in ('before', 'both') and start - head > 0
+            grow_after = mutator.context in ('after', 'both') and end + tail < len(text)
+            if head + tail >= MAX_CONTEXT or not (grow_before or grow_after):
+                break
+            head += grow_before
+            tail += grow_after
+
+
+class _Views:
+    """Substring, structural and normalized views of the texts one file's injection checks
+
+    Views are kept until the next keep() call, so the clean file and the
+    current bugged file (the new bug's "reverted alone" text) are built
+    once rather than for every candidate.
+    """
+
+    def __init__(self):
+        self.needles = {}
+        self._known = {}
+
+    def of(self, text):
+        views = self._known.get(text)
+        if views is None:
+            views = self._known[text] = (TextView(text), StructuralView(text), NormalizedView(text, self.needles))
+        return views
+
+    def keep(self, *texts):
+        self._known = {text: self._known[text] for text in texts if text in self._known}
+
+
+def _sound(bugs, clean, bugged, prefix, views):
+    """True if every bug is unfixed in `bugged` and fixed in clean and when reverted alone
+
+    Checked with the substring, structural and normalized views, so the
+    bug scores the same way under every scoring engine.
+    """
+    checks = [(entry, build_checker(dict(entry.bug, id=f"{prefix}-"))) for entry in bugs]
+    views.needles.update(normalized_needles(needle for _, (_, bug_needles, _) in checks for needle in bug_needles))
+    clean_views, bugged_views = views.of(clean), views.of(bugged)
+    # Newest first: it is the one most likely to fail, and its reverted text is already known
+    for entry, (check, _, _) in reversed(checks):
+        modified, original = entry.bug['modified'], entry.bug['original']
+        if bugged.count(modified) != 1:
+            return False
+        reverted_views = views.of(bugged.replace(modified, original, 1))
+        for clean_view, bugged_view, reverted_view in zip(clean_views, bugged_views, reverted_views):
+            if check(bugged_view) or not check(clean_view) or not check(reverted_view):
+                return False
+    return True
+
+
+def inject_file(text, prefix, count, rng):
+    """Apply `count` sound mutations of one file type; returns (bugged text, bug dicts)"""
+    mutators = [m for m in MUTATORS if m.prefix == prefix]
+    pools = {m: _candidates(m, text, rng) for m in mutators}
+    accepted = []
+    bugged = text
+    views = _Views()
+    while len(accepted) < count and pools:
+        # Rotate through the types so a site gets a spread of bug kinds
+        for mutator in list(rng.sample(list(pools), len(pools))):
+            if len(accepted) >= count:
+                break
+            for start, end, original, modified in pools[mutator]:
+                if any(start < other.end and other.start < end for other in accepted):
+                    continue
+                bug = {"id": "", "type": mutator.type, "difficulty": mutator.difficulty,
+                       "original": original, "modified": modified, "description": mutator.description}
+                entry = GeneratedBug(bug, start, end)
+                trial = _apply(text, accepted + [entry])
+                views.keep(text, bugged)
+                if _sound(accepted + [entry], text, trial, prefix, views):
+                    accepted.append(entry)
+                    bugged = trial
+                    break
+            else:
+                del pools[mutator]
+    if len(accepted) < count:
+        raise InjectionError(f"only {len(accepted)} of {count} {prefix} bugs could be placed soundly")
+
+    accepted.sort(key=lambda entry: entry.start)
+    bugs = []
+    for n, entry in enumerate(accepted, 1):
+        bugs.append(dict(entry.bug, id=f"{prefix}-{n:03d}"))
+    return bugged, bugs
+
+
+def _apply(text, entries):
+    """Replace each entry's span of the clean text with its modified text"""
+    parts = []
+    position = 0
+    for entry in sorted(entries, key=lambda entry: entry.start):
+        parts.append(text[position:entry.start])
+        parts.append(entry.bug['modified'])
+        position = entry.end
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def read_template(template_dir):
+    """Clean text of each scored file in a template directory"""
+    files = {}
+    for prefix, name in SUBMISSION_FILES.items():
+        path = os.path.join(template_dir, name)
+        with open(path, 'r', encoding='utf-8') as f:
+            files[name] = f.read()
+    return files
+
+
+def inject_bugs(template_dir, seed, site_id, counts=None, template_name=None, clean_files=None):
+    """Bugged file texts plus a validated bug pack for one seed
+
+    `counts` maps a bug ID prefix (HTML, CSS) to how many bugs to place;
+    `clean_files` skips re-reading the template when the caller has it.
+    """
+    started = time.perf_counter()
+    counts = counts or {prefix: 15 for prefix in SUBMISSION_FILES}
+    clean_files = clean_files or read_template(template_dir)
+    rng = random.Random(f"{seed}")
+
+    files = {}
+    bugs = []
+    for prefix, name in SUBMISSION_FILES.items():
+        bugged, file_bugs = inject_file(clean_files[name], prefix, counts.get(prefix, 0), rng)
+        files[name] = bugged
+        bugs.extend(dict(bug, file=name) for bug in file_bugs)
+
+    pack = make_pack(site_id, template_name or os.path.basename(os.path.normpath(template_dir)), bugs)
+    validate_pack(pack, site_id)
+    return InjectionResult(files, pack, time.perf_counter() - started)
+
+
+def write_site(template_dir, out_dir, files):
+    """Copy the template to out_dir with the bugged files swapped in (atomically)"""
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = os.path.join(parent, f'.building-{os.path.basename(out_dir)}-{os.getpid()}')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.copytree(template_dir, tmp_dir, ignore=shutil.ignore_patterns('*.py', '*.pyc', '__pycache__',
+                                                                         '*.backup', 'bug_log.json'))
+    for name, text in files.items():
+        path = os.path.join(tmp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    try:
+        os.rename(tmp_dir, out_dir)
+    except OSError:
+        # Built concurrently by someone else with the same seed
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(out_dir):
+            raise
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('template_dir')
+    parser.add_argument('out_dir')
+    parser.add_argument('--site-id', type=int, required=True)
+    parser.add_argument('--seed', default='0')
+    parser.add_argument('--html', type=int, default=15)
+    parser.add_argument('--css', type=int, default=15)
+    parser.add_argument('--template-name')
+    parser.add_argument('--pack-dir', help='also write the pack as <pack-dir>/site_<id>.json')
+    args = parser.parse_args()
+
+    if os.path.exists(args.out_dir):
+        sys.exit(f"{args.out_dir} already exists")
+    try:
+        result = inject_bugs(args.template_dir, args.seed, args.site_id, {'HTML': args.html, 'CSS': args.css},
+                             args.template_name)
+    except InjectionError as e:
+        sys.exit(f"❌ {e}")
+    write_site(args.template_dir, args.out_dir, result.files)
+    write_pack(result.pack, args.out_dir)
+    if args.pack_dir:
+        write_pack(result.pack, args.pack_dir)
+    print(f"✅ {result.pack['total_bugs']} bugs injected into {args.out_dir} in {result.seconds * 1000:.1f} ms")
+    for bug in result.pack['bugs']:
+        print(f"  {bug['id']:<9} {bug['type']:<20} {bug['original']!r} -> {bug['modified']!r}")
+
+
+if __name__ == '__main__':
+    main()
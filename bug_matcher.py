@@ -0,0 +1,120 @@
+"""Single-pass multi-needle matcher (Aho-Corasick) for bug verification.
+
+One automaton is built per site from every string the site's checkers
+look for. Scanning a file once yields, for every needle, the same count
+str.count() would give (leftmost, non-overlapping), which answers every
+presence/absence and count question the checkers in bug_plan.py ask.
+
+Only SCORING_ENGINE=automaton scans with it, so the transition table is
+built on the first scan rather than when the plan is compiled.
+tests/test_bug_matcher.py compares it against verify_specific_bugs().
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton compiled to a deterministic transition table"""
+
+    def __init__(self, needles):
+        self.needles = tuple(dict.fromkeys(n for n in needles if n))
+        self.index = {needle: i for i, needle in enumerate(self.needles)}
+        self._delta = None
+        self._outputs = None
+
+    def build(self):
+        """Compile the transition table now (scan() does this on first use)"""
+        if self._delta is not None:
+            return self
+
+        goto = [{}]
+        outputs = [[]]
+        for i, needle in enumerate(self.needles):
+            state = 0
+            for ch in needle:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(i)
+
+        # Breadth-first: fill failure links and complete the transition table,
+        # so scanning is a single dict lookup per character
+        fail = [0] * len(goto)
+        delta = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+            for ch, target in delta[fail[state]].items():
+                delta[state].setdefault(ch, target)
+
+        self._delta = delta
+        self._outputs = [tuple((i, len(self.needles[i])) for i in out) for out in outputs]
+        return self
+
+    def scan(self, text):
+        """Count every needle in one pass; returns {needle: count}"""
+        self.build()
+        delta = self._delta
+        outputs = self._outputs
+        counts = [0] * len(self.needles)
+        next_start = [0] * len(self.needles)
+
+        state = 0
+        for pos, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            matched = outputs[state]
+            if matched:
+                end = pos + 1
+                for i, length in matched:
+                    # Only count non-overlapping occurrences, like str.count()
+                    if end - length >= next_start[i]:
+                        counts[i] += 1
+                        next_start[i] = end
+
+        return dict(zip(self.needles, counts))
+
+
+class MatchView:
+    """Answers checker questions from a single automaton scan of a file"""
+
+    __slots__ = ('counts', 'pattern_counts')
+
+    structure = None
+    stylesheet = None
+    raw = None
+
+    def __init__(self, counts, pattern_counts):
+        self.counts = counts
+        self.pattern_counts = pattern_counts
+
+    def has(self, needle):
+        return not needle or self.counts[needle] > 0
+
+    def count(self, needle):
+        return self.counts[needle]
+
+    def pattern_count(self, pattern):
+        return self.pattern_counts[pattern]
+
+    def count_outside(self, needle, container):
+        """Occurrences of needle that are not part of an occurrence of container"""
+        return max(0, self.counts[needle] - self.counts[container] * container.count(needle))
+
+
+def scan_view(matcher, patterns, text):
+    """Scan a file once and wrap the results for the checkers"""
+    pattern_counts = {pattern: len(pattern.findall(text)) for pattern in patterns}
+    return MatchView(matcher.scan(text), pattern_counts)
+
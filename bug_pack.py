@@ -0,0 +1,264 @@
+"""Versioned, schema-checked bug packs: one JSON file per site.
+
+A pack replaces a site's entry in the old hardcoded bug log:
+
+    {"format": 1, "site_id": 1, "template_name": "...", "content_hash": "<sha256 of bugs>",
+     "total_bugs": 30, "html_bugs": 15, "css_bugs": 15, "js_bugs": 0,
+     "bugs": [{"id": "HTML-001", "file": "index.html", ...}, ...]}
+
+Each bug names the submission file it is checked in ("file", a path
+relative to the site root). HTML and CSS bugs written before that field
+existed fall back to index.html and css/style.css.
+
+Packs are read lazily, the first time a site is scored, and re-read only
+when the file changes on disk, so a new or edited pack is picked up
+without a restart. Each validated pack is also cached as a pickle under
+build/plans/, so later processes skip JSON parsing and validation.
+"""
+
+import os
+import re
+import json
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import namedtuple
+
+from bug_plan import BUG_PREFIXES, DIFFICULTY_POINTS, bug_file
+
+PACK_FORMAT = 1
+BUG_PACK_DIR = os.environ.get('BUG_PACK_DIR', 'bug_packs')
+PLAN_CACHE_DIR = os.environ.get('PLAN_CACHE_DIR', os.path.join('build', 'plans'))
+
+PACK_FILE_RE = re.compile(r'^site_(\d+)\.json$')
+
+# Every bug entry: field -> type, all required
+BUG_SCHEMA = {
+    'id': str,
+    'type': str,
+    'difficulty': str,
+    'original': str,
+    'modified': str,
+    'description': str,
+}
+
+# Optional bug fields: field -> type
+OPTIONAL_BUG_FIELDS = {
+    'file': str,
+}
+
+# A validated pack; `stamp` identifies the file revision
+LoadedPack = namedtuple('LoadedPack', 'site_id pack stamp')
+
+
+class BugPackError(ValueError):
+    """A bug pack file does not match the pack format"""
+
+
+def pack_hash(bugs):
+    """sha256 over the canonical JSON of a pack's bug list"""
+    encoded = json.dumps(bugs, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def make_pack(site_id, template_name, bugs):
+    """Build a pack dict (counts and content hash filled in) from a bug list"""
+    counts = {f"{prefix.lower()}_bugs": sum(1 for bug in bugs if bug['id'].split('-')[0] == prefix)
+              for prefix in BUG_PREFIXES}
+    return dict({
+        'format': PACK_FORMAT,
+        'site_id': site_id,
+        'template_name': template_name,
+        'content_hash': pack_hash(bugs),
+        'total_bugs': len(bugs),
+    }, **counts, bugs=bugs)
+
+
+def _relative_path(path):
+    """True for a forward-slash path that stays inside the site folder"""
+    return '\\' not in path and ':' not in path and all(part not in ('', '.', '..') for part in path.split('/'))
+
+
+def validate_pack(pack, site_id=None):
+    """Check a parsed pack; raises BugPackError listing every problem"""
+    if not isinstance(pack, dict):
+        raise BugPackError("bug pack must be an object")
+    if pack.get('format') != PACK_FORMAT:
+        raise BugPackError(f"unsupported bug pack format {pack.get('format')!r} (expected {PACK_FORMAT})")
+
+    errors = []
+    if not isinstance(pack.get('site_id'), int) or isinstance(pack.get('site_id'), bool):
+        errors.append("'site_id' must be int")
+    elif site_id is not None and pack['site_id'] != site_id:
+        errors.append(f"'site_id' is {pack['site_id']} but the file is for site {site_id}")
+    if not isinstance(pack.get('template_name'), str):
+        errors.append("'template_name' must be str")
+
+    bugs = pack.get('bugs')
+    if not isinstance(bugs, list):
+        raise BugPackError("; ".join(errors + ["'bugs' must be a list"]))
+
+    seen = set()
+    for n, bug in enumerate(bugs):
+        if not isinstance(bug, dict):
+            errors.append(f"bug #{n}: must be an object")
+            continue
+        label = bug.get('id', f"#{n}")
+        for field, field_type in BUG_SCHEMA.items():
+            if not isinstance(bug.get(field), field_type):
+                errors.append(f"bug {label}: '{field}' must be {field_type.__name__}")
+        for field, field_type in OPTIONAL_BUG_FIELDS.items():
+            if field in bug and not isinstance(bug[field], field_type):
+                errors.append(f"bug {label}: '{field}' must be {field_type.__name__}")
+        if isinstance(bug.get('file'), str) and not _relative_path(bug['file']):
+            errors.append(f"bug {label}: 'file' must be a relative path inside the site, like css/style.css")
+        if isinstance(bug.get('id'), str):
+            if bug['id'] in seen:
+                errors.append(f"bug {label}: duplicate id")
+            seen.add(bug['id'])
+            prefix = bug['id'].split('-')[0]
+            if prefix not in BUG_PREFIXES:
+                errors.append(f"bug {label}: id prefix must be one of {', '.join(BUG_PREFIXES)}")
+            elif 'file' not in bug and not bug_file(bug):
+                errors.append(f"bug {label}: {prefix} bugs must name their 'file'")
+        if bug.get('difficulty') not in DIFFICULTY_POINTS:
+            errors.append(f"bug {label}: 'difficulty' must be one of {', '.join(DIFFICULTY_POINTS)}")
+
+    if not errors and pack.get('content_hash') != pack_hash(bugs):
+        errors.append("'content_hash' does not match the bugs (edit with bug_pack.write_pack)")
+    if errors:
+        raise BugPackError("; ".join(errors))
+
+
+def pack_path(site_id, folder=BUG_PACK_DIR):
+    return os.path.join(folder, f'site_{site_id}.json')
+
+
+def _atomic_write(path, data, mode='w'):
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.pack-')
+    try:
+        with os.fdopen(fd, mode) as f:
+            if mode == 'wb':
+                f.write(data)
+            else:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.write('\n')
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_pack(pack, folder=BUG_PACK_DIR):
+    """Refresh a pack's counts and hash, validate it and write it atomically"""
+    pack = make_pack(pack['site_id'], pack['template_name'], pack['bugs'])
+    validate_pack(pack)
+    path = pack_path(pack['site_id'], folder)
+    _atomic_write(path, pack)
+    return path
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class BugPackStore:
+    """Lazily loaded bug packs, each cached until its file changes"""
+
+    def __init__(self, folder=BUG_PACK_DIR, cache_folder=PLAN_CACHE_DIR):
+        self.folder = folder
+        self.cache_folder = cache_folder
+        self._lock = threading.Lock()
+        self._loaded = {}
+        # site_id -> (stamp, message) of the last pack file that failed to load
+        self._errors = {}
+
+    def site_ids(self):
+        """Every site with a pack file, sorted"""
+        try:
+            names = os.listdir(self.folder)
+        except OSError:
+            return []
+        return sorted(int(m.group(1)) for m in map(PACK_FILE_RE.match, names) if m)
+
+    def get(self, site_id):
+        """LoadedPack for a site, or None if it has no (valid) pack"""
+        try:
+            site_id = int(site_id)
+        except (TypeError, ValueError):
+            return None
+        stamp = _file_stamp(pack_path(site_id, self.folder))
+        loaded = self._loaded.get(site_id)
+        if loaded is not None and loaded.stamp == stamp:
+            return loaded
+        with self._lock:
+            loaded = self._loaded.get(site_id)
+            if loaded is not None and loaded.stamp == stamp:
+                return loaded
+            if stamp is None:
+                self._loaded.pop(site_id, None)
+                return None
+            if self._errors.get(site_id, (None,))[0] == stamp:
+                return loaded
+            try:
+                loaded = self._load(site_id, stamp)
+            except (OSError, ValueError, pickle.UnpicklingError) as e:
+                # Keep scoring with the last good pack rather than dropping the site
+                self._errors[site_id] = (stamp, str(e))
+                print(f"Error loading bug pack for site {site_id}: {e}")
+                return self._loaded.get(site_id)
+            self._errors.pop(site_id, None)
+            self._loaded[site_id] = loaded
+            return loaded
+
+    def _cache_path(self, site_id):
+        return os.path.join(self.cache_folder, f'site_{site_id}.pickle')
+
+    def _load(self, site_id, stamp):
+        cache_path = self._cache_path(site_id)
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('format') == PACK_FORMAT and cached.get('stamp') == stamp[:2]:
+                return LoadedPack(site_id, cached['pack'], stamp)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, TypeError, KeyError):
+            pass
+
+        with open(pack_path(site_id, self.folder), 'r', encoding='utf-8') as f:
+            pack = json.load(f)
+        validate_pack(pack, site_id)
+
+        try:
+            # mtime and size only: the inode is new after every atomic replace of the cache
+            _atomic_write(cache_path, pickle.dumps({'format': PACK_FORMAT, 'stamp': stamp[:2], 'pack': pack},
+                                                   protocol=pickle.HIGHEST_PROTOCOL), 'wb')
+        except OSError as e:
+            print(f"Could not cache compiled bug pack for site {site_id}: {e}")
+        return LoadedPack(site_id, pack, stamp)
+
+    def reload(self):
+        """Re-check every pack file now; returns {site_id: status dict}"""
+        site_ids = self.site_ids()
+        with self._lock:
+            self._loaded = {site_id: loaded for site_id, loaded in self._loaded.items() if site_id in site_ids}
+        status = {}
+        for site_id in site_ids:
+            loaded = self.get(site_id)
+            status[site_id] = {
+                "loaded": loaded is not None,
+                "content_hash": loaded.pack['content_hash'] if loaded else None,
+                "bugs": len(loaded.pack['bugs']) if loaded else 0,
+                "error": self._errors.get(site_id, (None, None))[1],
+            }
+        return status
+
+
+bug_packs = BugPackStore()
@@ -0,0 +1,366 @@
+"""Compile a site's bug log into a reusable verification plan.
+
+A plan is an immutable tuple of checks, one per bug, each holding a
+prebuilt checker callable and its precomputed points. Checkers give
+exactly the same answers as verify_specific_bugs() in bug_rules.py, but
+the bug type dispatch, points lookup and regex compilation happen once
+when the plan is built instead of on every submission.
+
+Run this module directly to score every bug pack's fully fixed site
+under each scoring engine.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from collections import namedtuple
+
+from bug_matcher import AhoCorasick, scan_view
+from html_structure import HTMLStructure, structural_checker
+from css_structure import StyleIndex, stylesheet_checker
+from normalize import NormalizedText, merges_needles, normalize_needle, normalized_needles
+
+# Default file for each bug ID prefix; a bug's own "file" field names any other
+# file of the site (a second page, a script). JS bugs have no default file.
+SUBMISSION_FILES = {"HTML": "index.html", "CSS": "css/style.css"}
+BUG_PREFIXES = ("HTML", "CSS", "JS")
+
+DIFFICULTY_POINTS = {"easy": 10, "medium": 20, "hard": 30}
+
+QUOTED_CLASS_RE = re.compile(r'class="[^"]*"')
+UNQUOTED_CLASS_RE = re.compile(r'class=[^"\s>]+')
+
+ENGINES = ('substring', 'automaton', 'structural', 'normalized')
+
+# Engines: "substring" runs str scans per check, "automaton" scans each file once,
+# "structural" is substring plus token-level checks for HTML (html_structure.py) and
+# CSS (css_structure.py) bug types where their snippets allow it, "normalized" runs the
+# substring checks on whitespace-, quote- and tag-case-normalised text (normalize.py)
+SCORING_ENGINE = os.environ.get('SCORING_ENGINE', 'substring')
+
+BugCheck = namedtuple('BugCheck', 'bug_id file points check bug')
+SitePlan = namedtuple('SitePlan', 'site_id version checks files total_points build_seconds matcher patterns '
+                                   'normalized')
+
+
+class TextView:
+    """Answers checker questions by scanning the file text directly"""
+
+    __slots__ = ('text',)
+
+    # No token-level answers; structural checkers fall back to substrings
+    structure = None
+    stylesheet = None
+    # Already the raw text
+    raw = None
+
+    def __init__(self, text):
+        self.text = text
+
+    def has(self, needle):
+        return needle in self.text
+
+    def count(self, needle):
+        return self.text.count(needle)
+
+    def pattern_count(self, pattern):
+        return len(pattern.findall(self.text))
+
+    def count_outside(self, needle, container):
+        """Occurrences of needle that are not part of an occurrence of container"""
+        return max(0, self.count(needle) - self.count(container) * container.count(needle))
+
+
+class StructuralView(TextView):
+    """TextView that also answers token-level questions about HTML and CSS"""
+
+    __slots__ = ('_structure', '_stylesheet')
+
+    def __init__(self, text):
+        super().__init__(text)
+        self._structure = None
+        self._stylesheet = None
+
+    # Each is built on first use, so a file only pays for the one its checkers ask for
+    @property
+    def structure(self):
+        if self._structure is None:
+            self._structure = HTMLStructure(self.text)
+        return self._structure
+
+    @property
+    def stylesheet(self):
+        if self._stylesheet is None:
+            self._stylesheet = StyleIndex(self.text)
+        return self._stylesheet
+
+
+class NormalizedView(TextView):
+    """TextView over a file's normalised text, asked with pre-normalised needles"""
+
+    __slots__ = ('needles', 'normalized', '_raw')
+
+    def __init__(self, text, needles):
+        self.normalized = NormalizedText(text)
+        super().__init__(self.normalized.text)
+        # {needle: normalised needle}, from the plan
+        self.needles = needles
+        self._raw = None
+
+    @property
+    def raw(self):
+        """TextView of the original text, for checks normalisation would blur"""
+        if self._raw is None:
+            self._raw = TextView(self.normalized.original)
+        return self._raw
+
+    def has(self, needle):
+        return self.needles[needle] in self.text
+
+    def count(self, needle):
+        return self.text.count(self.needles[needle])
+
+    def count_outside(self, needle, container):
+        # Containment is judged on the normalised forms: "<!-- End -->" is part of "</div><!-- End -->"
+        needle, container = self.needles[needle], self.needles[container]
+        return max(0, self.text.count(needle) - self.text.count(container) * container.count(needle))
+
+
+def _never_fixed(view):
+    return False
+
+
+def build_checker(bug):
+    """Return (checker, needles, patterns) for a bug
+
+    The checker takes a view of the file (TextView, MatchView or
+    StructuralView) and decides whether the bug is fixed; needles and
+    patterns are every substring and regex it asks the view about.
+    """
+    checker, needles, patterns = _text_checker(bug)
+    if merges_needles(needles):
+        # e.g. "< div" -> "<div": normalised, the bug and its fix look the same
+        checker = _on_raw_text(checker)
+    structural = structural_checker(bug)
+    if structural is not None:
+        return _prefer('structure', structural, checker), needles, patterns
+    structural = stylesheet_checker(bug)
+    if structural is not None:
+        return _prefer('stylesheet', structural, checker), needles, patterns
+    return checker, needles, patterns
+
+
+def _on_raw_text(checker):
+    """Checker that asks a normalized view's raw text instead"""
+    def check(view):
+        raw = view.raw
+        return checker(view if raw is None else raw)
+    return check
+
+
+def _prefer(attribute, structural, checker):
+    """Checker asking the view's structural index when it has one"""
+    def check(view):
+        index = getattr(view, attribute)
+        return checker(view) if index is None else structural(index)
+    return check
+
+
+def _text_checker(bug):
+    """(checker, needles, patterns) answering a bug from substrings and regexes"""
+    bug_type = bug.get("type", "")
+    original = bug.get("original", "")
+    modified = bug.get("modified", "")
+
+    if bug_type == "missing_doctype":
+        return (lambda view: view.has("<!DOCTYPE html>")), ("<!DOCTYPE html>",), ()
+
+    elif bug_type == "invalid_tag":
+        if "body" in original and "bod" in modified:
+            return (lambda view: view.has("<body>") and not view.has("<bod>")), ("<body>", "<bod>"), ()
+        return _never_fixed, (), ()
+
+    elif bug_type == "attribute_typo":
+        if "class=" in original and "clas=" in modified:
+            return (lambda view: view.count("class=") > view.count("clas=")), ("class=", "clas="), ()
+        return _never_fixed, (), ()
+
+    elif bug_type == "missing_quotes":
+        if 'class="' in original and 'class=' in modified:
+            return (lambda view: (view.pattern_count(QUOTED_CLASS_RE) >
+                                  view.pattern_count(UNQUOTED_CLASS_RE))), (), (QUOTED_CLASS_RE, UNQUOTED_CLASS_RE)
+        return _never_fixed, (), ()
+
+    elif bug_type == "missing_semicolon":
+        if original.endswith(";") and not modified.endswith(";"):
+            return (lambda view: view.has(original)), (original,), ()
+        return _never_fixed, (), ()
+
+    elif bug_type == "property_typo":
+        if ":" in original and ":" in modified:
+            correct_prop = original.split(":")[0]
+            wrong_prop = modified.split(":")[0]
+            return (lambda view: view.has(correct_prop) and not view.has(wrong_prop)), (correct_prop, wrong_prop), ()
+        return _never_fixed, (), ()
+
+    # Generic check: if modified (buggy) code is gone and original is present. Deleting
+    # bugs leave modified inside original, so only copies outside an original count
+    elif modified and original:
+        if modified in original or normalize_needle(modified) in normalize_needle(original):
+            return ((lambda view: view.has(original) and not view.count_outside(modified, original)),
+                    (modified, original), ())
+        return (lambda view: not view.has(modified) and view.has(original)), (modified, original), ()
+
+    elif original:
+        return (lambda view: view.has(original)), (original,), ()
+
+    return _never_fixed, (), ()
+
+
+def bug_file(bug):
+    """Submission file a bug is checked in, or None if it names none"""
+    return bug.get("file") or SUBMISSION_FILES.get(bug.get("id", "").split("-")[0])
+
+
+def bug_log_version(bug_data):
+    """Short content hash identifying a bug log revision"""
+    if bug_data.get('content_hash'):
+        # Bug packs carry a hash of their bug list already
+        return bug_data['content_hash'][:12]
+    encoded = json.dumps(bug_data, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:12]
+
+
+def compile_plan(site_id, bug_data):
+    """Compile a bug log dict into a SitePlan"""
+    started = time.perf_counter()
+
+    checks = []
+    files = []
+    needles = []
+    patterns = []
+    for bug in bug_data.get("bugs", []):
+        bug_id = bug.get("id", "")
+        file = bug_file(bug)
+        if file is None:
+            continue
+        if file not in files:
+            files.append(file)
+        points = DIFFICULTY_POINTS.get(bug.get("difficulty", "easy"), 10)
+        checker, bug_needles, bug_patterns = build_checker(bug)
+        needles.extend(bug_needles)
+        patterns.extend(p for p in bug_patterns if p not in patterns)
+        checks.append(BugCheck(bug_id, file, points, checker, bug))
+
+    return SitePlan(
+        site_id=site_id,
+        version=bug_log_version(bug_data),
+        checks=tuple(checks),
+        files=tuple(files),
+        total_points=sum(check.points for check in checks),
+        build_seconds=time.perf_counter() - started,
+        # Its transition table is only built if the automaton engine scans with it
+        matcher=AhoCorasick(needles),
+        patterns=tuple(patterns),
+        normalized=normalized_needles(needles))
+
+
+def file_view(plan, text, engine=None):
+    """Build the view the checkers query for one file's text"""
+    engine = engine or SCORING_ENGINE
+    if engine == 'automaton':
+        return scan_view(plan.matcher, plan.patterns, text)
+    if engine == 'structural':
+        return StructuralView(text)
+    if engine == 'normalized':
+        return NormalizedView(text, plan.normalized)
+    return TextView(text)
+
+
+def run_file(plan, file, text, engine=None):
+    """Run the checks targeting one file; returns their fixed flags in plan order"""
+    view = file_view(plan, text, engine)
+    return tuple(check.check(view) for check in plan.checks if check.file == file)
+
+
+def merge_file_results(plan, file_results):
+    """Interleave per-file fixed flags back into plan order"""
+    iterators = {file: iter(results) for file, results in file_results.items()}
+    return tuple(next(iterators[check.file]) for check in plan.checks)
+
+
+def run_plan(plan, contents, engine=None):
+    """Run every check of a plan; returns a tuple of fixed flags in plan order"""
+    return merge_file_results(plan, {
+        file: run_file(plan, file, contents.get(file, ""), engine)
+        for file in plan.files
+    })
+
+
+def fixed_site(plan, folder):
+    """({file: text}, appended bug IDs) for a site's bugged template with every bug fixed
+
+    A bug whose modified text is not in the template gets its original
+    appended instead.
+    """
+    contents = {}
+    for file in plan.files:
+        path = os.path.join(folder, *file.split('/'))
+        if not os.path.exists(path):
+            # The shipped templates keep their stylesheet at the top level
+            names = [name for name in sorted(os.listdir(folder)) if name.endswith(os.path.splitext(file)[1])]
+            path = os.path.join(folder, names[0]) if names else None
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                contents[file] = f.read()
+    appended = set()
+    for check in plan.checks:
+        text = contents.get(check.file, "")
+        original, modified = check.bug.get("original", ""), check.bug.get("modified", "")
+        if modified and modified in text:
+            # Leave the copies inside an original alone: ":hove" -> ":hover" must not touch ":hover"
+            text = original.join(part.replace(modified, original) for part in text.split(original))
+        elif original not in text:
+            text += "\n" + original
+            appended.add(check.bug_id)
+        contents[check.file] = text
+    return contents, appended
+
+
+def fixed_site_check(template_root=os.path.join('templates', 'bugged_sites')):
+    """Bugs the substring engine counts fixed on a fully fixed site but another engine does not
+
+    Returns [(site_id, engine, bug_id)].
+    """
+    from bug_pack import bug_packs
+
+    missed = []
+    for site_id in bug_packs.site_ids():
+        loaded = bug_packs.get(site_id)
+        folder = os.path.join(template_root, f'site_{site_id}')
+        if loaded is None or not os.path.isdir(folder):
+            continue
+        plan = compile_plan(site_id, loaded.pack)
+        contents, appended = fixed_site(plan, folder)
+        expected = run_plan(plan, contents, 'substring')
+        for engine in ENGINES:
+            results = run_plan(plan, contents, engine)
+            for check, want, fixed in zip(plan.checks, expected, results):
+                # An appended snippet sits outside any tag or rule, which only the
+                # structural engine looks at
+                if engine == 'structural' and check.bug_id in appended:
+                    continue
+                if want and not fixed:
+                    missed.append((site_id, engine, check.bug_id))
+        print(f"Site {site_id}: {sum(expected)}/{len(plan.checks)} fixed under substring")
+    return missed
+
+
+if __name__ == "__main__":
+    missed = fixed_site_check()
+    if missed:
+        print(f"❌ {len(missed)} fixed bugs scored unfixed, first: {missed[:5]}")
+        raise SystemExit(1)
+    print("✅ Every engine scores the fixed sites like the substring engine")
@@ -1,1148 +1,95 @@
+import io
 import os
 import json
+import zipfile
 from datetime import datetime
 import re
+import time
+from collections import namedtuple
 
-
-def get_hardcoded_bug_log(site_id):
-    """Get hardcoded bug log for a specific site"""
-
-    # Hardcoded bug logs for all sites
-    bug_logs = {
-        1: {
-            "template_name":
-            "drinking-water-website-template",
-            "site_id":
-            1,
-            "total_bugs":
-            30,
-            "html_bugs":
-            15,
-            "css_bugs":
-            15,
-            "bugs": [{
-                "id": "HTML-001",
-                "type": "missing_doctype",
-                "difficulty": "easy",
-                "original": "<!DOCTYPE html>",
-                "modified": "",
-                "description": "Removed DOCTYPE declaration"
-            }, {
-                "id": "HTML-002",
-                "type": "invalid_tag",
-                "difficulty": "medium",
-                "original": "<body>",
-                "modified": "<bod>",
-                "description": "Changed body to bod"
-            }, {
-                "id": "HTML-003",
-                "type": "missing_closing_tag",
-                "difficulty": "easy",
-                "original": "</div>\n    <!-- Spinner End -->",
-                "modified": "\n    <!-- Spinner End -->",
-                "description": "Missing closing div in spinner"
-            }, {
-                "id": "HTML-004",
-                "type": "attribute_typo",
-                "difficulty": "easy",
-                "original": "class=\"navbar-nav",
-                "modified": "clas=\"navbar-nav",
-                "description": "Typo in class attribute"
-            }, {
-                "id": "HTML-005",
-                "type": "missing_quotes",
-                "difficulty": "easy",
-                "original": "class=\"btn btn-primary\"",
-                "modified": "class=btn btn-primary",
-                "description": "Missing quotes in class attribute"
-            }, {
-                "id": "HTML-006",
-                "type": "tag_typo",
-                "difficulty": "easy",
-                "original": "<div class=\"container\">",
-                "modified": "<dvi class=\"container\">",
-                "description": "Changed div to dvi"
-            }, {
-                "id": "HTML-007",
-                "type": "missing_alt",
-                "difficulty": "easy",
-                "original": "alt=\"\"",
-                "modified": "",
-                "description": "Removed alt attribute"
-            }, {
-                "id": "HTML-008",
-                "type": "broken_href",
-                "difficulty": "easy",
-                "original": "href=\"#about\"",
-                "modified": "href=\"#abou\"",
-                "description": "Broken href link"
-            }, {
-                "id": "HTML-009",
-                "type": "extra_space",
-                "difficulty": "medium",
-                "original": "<div class=\"row\">",
-                "modified": "< div class=\"row\">",
-                "description": "Extra space in div tag"
-            }, {
-                "id": "HTML-010",
-                "type": "missing_bracket",
-                "difficulty": "medium",
-                "original": "<div class=\"col-lg-6\">",
-                "modified": "<div class=\"col-lg-6\"",
-                "description": "Missing closing bracket"
-            }, {
-                "id": "HTML-011",
-                "type": "nested_mismatch",
-                "difficulty": "medium",
-                "original": "<h1>Clean Water</h1>",
-                "modified": "<h1>Clean Water</div>",
-                "description": "Mismatched nested tags"
-            }, {
-                "id": "HTML-012",
-                "type": "missing_meta",
-                "difficulty": "medium",
-                "original":
-                "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">",
-                "modified": "",
-                "description": "Removed viewport meta tag"
-            }, {
-                "id": "HTML-013",
-                "type": "broken_comment",
-                "difficulty": "hard",
-                "original": "<!-- Spinner Start -->",
-                "modified": "<!- Spinner Start -->",
-                "description": "Broken HTML comment"
-            }, {
-                "id": "HTML-014",
-                "type": "invisible_char",
-                "difficulty": "hard",
-                "original": "Read More",
-                "modified": "Read\u200BMore",
-                "description": "Invisible character injection"
-            }, {
-                "id": "HTML-015",
-                "type": "self_closing",
-                "difficulty": "hard",
-                "original": "<br>",
-                "modified": "<br />",
-                "description": "Self-closing tag formatting"
-            }, {
-                "id": "CSS-016",
-                "type": "missing_semicolon",
-                "difficulty": "easy",
-                "original": "opacity: 0;",
-                "modified": "opacity: 0",
-                "description": "Missing semicolon in opacity"
-            }, {
-                "id": "CSS-017",
-                "type": "missing_brace",
-                "difficulty": "medium",
-                "original": "z-index: 99999;\n}",
-                "modified": "z-index: 99999;\n",
-                "description": "Missing closing brace"
-            }, {
-                "id": "CSS-018",
-                "type": "property_typo",
-                "difficulty": "easy",
-                "original": "background:",
-                "modified": "backgrund:",
-                "description": "Typo in background property"
-            }, {
-                "id": "CSS-019",
-                "type": "invalid_unit",
-                "difficulty": "easy",
-                "original": "30px",
-                "modified": "30pix",
-                "description": "Invalid CSS unit"
-            }, {
-                "id": "CSS-020",
-                "type": "missing_bracket",
-                "difficulty": "easy",
-                "original": ".btn-square {",
-                "modified": ".btn-square ",
-                "description": "Missing CSS bracket"
-            }, {
-                "id": "CSS-021",
-                "type": "invalid_variable",
-                "difficulty": "medium",
-                "original": "var(--bs-white)",
-                "modified": "var(--bs-whiteG)",
-                "description": "Invalid CSS variable name"
-            }, {
-                "id": "CSS-022",
-                "type": "missing_colon",
-                "difficulty": "easy",
-                "original": "color:",
-                "modified": "color ",
-                "description": "Missing colon in color property"
-            }, {
-                "id": "CSS-023",
-                "type": "invalid_selector",
-                "difficulty": "medium",
-                "original": ".navbar-brand",
-                "modified": ".navbar-brand$",
-                "description": "Invalid CSS selector character"
-            }, {
-                "id": "CSS-024",
-                "type": "media_query_typo",
-                "difficulty": "medium",
-                "original": "@media (max-width: 991.98px)",
-                "modified": "@mdia (max-width: 991.98px)",
-                "description": "Typo in media query"
-            }, {
-                "id": "CSS-025",
-                "type": "flexbox_typo",
-                "difficulty": "medium",
-                "original": "justify-content:",
-                "modified": "justify-conten:",
-                "description": "Typo in flexbox property"
-            }, {
-                "id": "CSS-026",
-                "type": "pseudo_class_typo",
-                "difficulty": "medium",
-                "original": ":hover",
-                "modified": ":hove",
-                "description": "Typo in hover pseudo-class"
-            }, {
-                "id": "CSS-027",
-                "type": "variable_syntax",
-                "difficulty": "hard",
-                "original": "var(--bs-primary)",
-                "modified": "var(-bs-primary)",
-                "description": "CSS variable syntax error"
-            }, {
-                "id": "CSS-028",
-                "type": "transform_typo",
-                "difficulty": "hard",
-                "original": "transform:",
-                "modified": "transfor:",
-                "description": "Typo in transform property"
-            }, {
-                "id": "CSS-029",
-                "type": "important_typo",
-                "difficulty": "hard",
-                "original": "!important",
-                "modified": "!importan",
-                "description": "Typo in !important declaration"
-            }, {
-                "id": "CSS-030",
-                "type": "invalid_percentage",
-                "difficulty": "hard",
-                "original": "100%",
-                "modified": "100percent",
-                "description": "Invalid percentage unit"
-            }]
-        },
-        2: {
-            "template_name":
-            "mobile-app-html-template",
-            "site_id":
-            2,
-            "total_bugs":
-            30,
-            "html_bugs":
-            15,
-            "css_bugs":
-            15,
-            "bugs": [{
-                "id": "HTML-001",
-                "type": "missing_doctype",
-                "difficulty": "easy",
-                "original": "<!DOCTYPE html>",
-                "modified": "",
-                "description": "Removed DOCTYPE declaration"
-            }, {
-                "id": "HTML-002",
-                "type": "invalid_tag",
-                "difficulty": "medium",
-                "original": "<body>",
-                "modified": "<bod>",
-                "description": "Changed body to bod"
-            }, {
-                "id": "HTML-003",
-                "type": "missing_closing_tag",
-                "difficulty": "easy",
-                "original": "</div>\n    <!-- Contact Us -->",
-                "modified": "\n    <!-- Contact Us -->",
-                "description": "Missing closing div in contact section"
-            }, {
-                "id": "HTML-004",
-                "type": "attribute_typo",
-                "difficulty": "easy",
-                "original": "class=\"navbar-nav",
-                "modified": "clas=\"navbar-nav",
-                "description": "Typo in class attribute"
-            }, {
-                "id": "HTML-005",
-                "type": "missing_quotes",
-                "difficulty": "easy",
-                "original": "class=\"btn btn-primary\"",
-                "modified": "class=btn btn-primary",
-                "description": "Missing quotes in class attribute"
-            }, {
-                "id": "HTML-006",
-                "type": "tag_typo",
-                "difficulty": "easy",
-                "original": "<div class=\"container\">",
-                "modified": "<dvi class=\"container\">",
-                "description": "Changed div to dvi"
-            }, {
-                "id": "HTML-007",
-                "type": "missing_alt",
-                "difficulty": "easy",
-                "original": "alt=\"\"",
-                "modified": "",
-                "description": "Removed alt attribute"
-            }, {
-                "id": "HTML-008",
-                "type": "broken_href",
-                "difficulty": "easy",
-                "original": "href=\"#\"",
-                "modified": "href=\"#broken\"",
-                "description": "Broken href link"
-            }, {
-                "id": "HTML-009",
-                "type": "extra_space",
-                "difficulty": "medium",
-                "original": "<div class=\"row\">",
-                "modified": "< div class=\"row\">",
-                "description": "Extra space in div tag"
-            }, {
-                "id": "HTML-010",
-                "type": "missing_bracket",
-                "difficulty": "medium",
-                "original": "<div class=\"col-lg-6\">",
-                "modified": "<div class=\"col-lg-6\"",
-                "description": "Missing closing bracket"
-            }, {
-                "id": "HTML-011",
-                "type": "nested_mismatch",
-                "difficulty": "medium",
-                "original": "<h1>Read More</h1>",
-                "modified": "<h1>Read More</div>",
-                "description": "Mismatched nested tags"
-            }, {
-                "id": "HTML-012",
-                "type": "missing_meta",
-                "difficulty": "medium",
-                "original":
-                "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">",
-                "modified": "",
-                "description": "Removed viewport meta tag"
-            }, {
-                "id": "HTML-013",
-                "type": "broken_comment",
-                "difficulty": "hard",
-                "original": "<!-- Contact Us -->",
-                "modified": "<!- Contact Us -->",
-                "description": "Broken HTML comment"
-            }, {
-                "id": "HTML-014",
-                "type": "invisible_char",
-                "difficulty": "hard",
-                "original": "Contact Us",
-                "modified": "Contact\u200BUs",
-                "description": "Invisible character injection"
-            }, {
-                "id": "HTML-015",
-                "type": "self_closing",
-                "difficulty": "hard",
-                "original": "<br>",
-                "modified": "<br />",
-                "description": "Self-closing tag formatting"
-            }, {
-                "id": "CSS-016",
-                "type": "missing_semicolon",
-                "difficulty": "easy",
-                "original": "opacity: 0;",
-                "modified": "opacity: 0",
-                "description": "Missing semicolon in opacity"
-            }, {
-                "id": "CSS-017",
-                "type": "missing_brace",
-                "difficulty": "medium",
-                "original": "z-index: 99999;\n}",
-                "modified": "z-index: 99999;\n",
-                "description": "Missing closing brace"
-            }, {
-                "id": "CSS-018",
-                "type": "property_typo",
-                "difficulty": "easy",
-                "original": "background:",
-                "modified": "backgrund:",
-                "description": "Typo in background property"
-            }, {
-                "id": "CSS-019",
-                "type": "invalid_unit",
-                "difficulty": "easy",
-                "original": "38px",
-                "modified": "38pix",
-                "description": "Invalid CSS unit"
-            }, {
-                "id": "CSS-020",
-                "type": "missing_bracket",
-                "difficulty": "easy",
-                "original": ".btn-square {",
-                "modified": ".btn-square ",
-                "description": "Missing CSS bracket"
-            }, {
-                "id": "CSS-021",
-                "type": "invalid_variable",
-                "difficulty": "medium",
-                "original": "var(--primary)",
-                "modified": "var(--primaryX)",
-                "description": "Invalid CSS variable name"
-            }, {
-                "id": "CSS-022",
-                "type": "missing_colon",
-                "difficulty": "easy",
-                "original": "color:",
-                "modified": "color ",
-                "description": "Missing colon in color property"
-            }, {
-                "id": "CSS-023",
-                "type": "invalid_selector",
-                "difficulty": "medium",
-                "original": ".navbar-light",
-                "modified": ".navbar-light$",
-                "description": "Invalid CSS selector character"
-            }, {
-                "id": "CSS-024",
-                "type": "media_query_typo",
-                "difficulty": "medium",
-                "original": "@media (max-width: 991.98px)",
-                "modified": "@mdia (max-width: 991.98px)",
-                "description": "Typo in media query"
-            }, {
-                "id": "CSS-025",
-                "type": "flexbox_typo",
-                "difficulty": "medium",
-                "original": "justify-content:",
-                "modified": "justify-conten:",
-                "description": "Typo in flexbox property"
-            }, {
-                "id": "CSS-026",
-                "type": "pseudo_class_typo",
-                "difficulty": "medium",
-                "original": ":hover",
-                "modified": ":hove",
-                "description": "Typo in hover pseudo-class"
-            }, {
-                "id": "CSS-027",
-                "type": "variable_syntax",
-                "difficulty": "hard",
-                "original": "var(--secondary)",
-                "modified": "var(-secondary)",
-                "description": "CSS variable syntax error"
-            }, {
-                "id": "CSS-028",
-                "type": "transform_typo",
-                "difficulty": "hard",
-                "original": "transform:",
-                "modified": "transfor:",
-                "description": "Typo in transform property"
-            }, {
-                "id": "CSS-029",
-                "type": "important_typo",
-                "difficulty": "hard",
-                "original": "!important",
-                "modified": "!importan",
-                "description": "Typo in !important declaration"
-            }, {
-                "id": "CSS-030",
-                "type": "invalid_percentage",
-                "difficulty": "hard",
-                "original": "100%",
-                "modified": "100percent",
-                "description": "Invalid percentage unit"
-            }]
-        },
-        3: {
-            "template_name":
-            "online-shop-website-template",
-            "site_id":
-            3,
-            "total_bugs":
-            30,
-            "html_bugs":
-            15,
-            "css_bugs":
-            15,
-            "bugs": [{
-                "id": "HTML-001",
-                "type": "missing_doctype",
-                "difficulty": "easy",
-                "original": "<!DOCTYPE html>",
-                "modified": "",
-                "description": "Removed DOCTYPE declaration"
-            }, {
-                "id": "HTML-002",
-                "type": "invalid_tag",
-                "difficulty": "medium",
-                "original": "<body>",
-                "modified": "<bod>",
-                "description": "Changed body to bod"
-            }, {
-                "id": "HTML-003",
-                "type": "missing_closing_tag",
-                "difficulty": "easy",
-                "original": "</div>\n    <!-- Shop End -->",
-                "modified": "\n    <!-- Shop End -->",
-                "description": "Missing closing div in shop section"
-            }, {
-                "id": "HTML-004",
-                "type": "attribute_typo",
-                "difficulty": "easy",
-                "original": "class=\"navbar-nav",
-                "modified": "clas=\"navbar-nav",
-                "description": "Typo in class attribute"
-            }, {
-                "id": "HTML-005",
-                "type": "missing_quotes",
-                "difficulty": "easy",
-                "original": "class=\"btn btn-primary\"",
-                "modified": "class=btn btn-primary",
-                "description": "Missing quotes in class attribute"
-            }, {
-                "id": "HTML-006",
-                "type": "tag_typo",
-                "difficulty": "easy",
-                "original": "<div class=\"container-fluid\">",
-                "modified": "<dvi class=\"container-fluid\">",
-                "description": "Changed div to dvi"
-            }, {
-                "id": "HTML-007",
-                "type": "missing_alt",
-                "difficulty": "easy",
-                "original": "alt=\"\"",
-                "modified": "",
-                "description": "Removed alt attribute"
-            }, {
-                "id": "HTML-008",
-                "type": "broken_href",
-                "difficulty": "easy",
-                "original": "href=\"shop.html\"",
-                "modified": "href=\"sho.html\"",
-                "description": "Broken shop.html link"
-            }, {
-                "id": "HTML-009",
-                "type": "extra_space",
-                "difficulty": "medium",
-                "original": "<div class=\"row\">",
-                "modified": "< div class=\"row\">",
-                "description": "Extra space in div tag"
-            }, {
-                "id": "HTML-010",
-                "type": "missing_bracket",
-                "difficulty": "medium",
-                "original": "<div class=\"col-lg-4\">",
-                "modified": "<div class=\"col-lg-4\"",
-                "description": "Missing closing bracket"
-            }, {
-                "id": "HTML-011",
-                "type": "nested_mismatch",
-                "difficulty": "medium",
-                "original": "<h3>Shop Now</h3>",
-                "modified": "<h3>Shop Now</div>",
-                "description": "Mismatched nested tags"
-            }, {
-                "id": "HTML-012",
-                "type": "missing_meta",
-                "difficulty": "medium",
-                "original":
-                "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">",
-                "modified": "",
-                "description": "Removed viewport meta tag"
-            }, {
-                "id": "HTML-013",
-                "type": "broken_comment",
-                "difficulty": "hard",
-                "original": "<!-- Shop Start -->",
-                "modified": "<!- Shop Start -->",
-                "description": "Broken HTML comment"
-            }, {
-                "id": "HTML-014",
-                "type": "invisible_char",
-                "difficulty": "hard",
-                "original": "Add To Cart",
-                "modified": "Add\u200BTo Cart",
-                "description": "Invisible character in 'Add To Cart'"
-            }, {
-                "id": "HTML-015",
-                "type": "self_closing",
-                "difficulty": "hard",
-                "original": "<img",
-                "modified": "<img /",
-                "description": "Improper img tag formatting"
-            }, {
-                "id": "CSS-016",
-                "type": "missing_semicolon",
-                "difficulty": "easy",
-                "original": "opacity: 0;",
-                "modified": "opacity: 0",
-                "description": "Missing semicolon in opacity"
-            }, {
-                "id": "CSS-017",
-                "type": "missing_brace",
-                "difficulty": "medium",
-                "original": "z-index: 99999;\n}",
-                "modified": "z-index: 99999;\n",
-                "description": "Missing closing brace"
-            }, {
-                "id": "CSS-018",
-                "type": "property_typo",
-                "difficulty": "easy",
-                "original": "background:",
-                "modified": "backgrund:",
-                "description": "Typo in background property"
-            }, {
-                "id": "CSS-019",
-                "type": "invalid_unit",
-                "difficulty": "easy",
-                "original": "25px",
-                "modified": "25pix",
-                "description": "Invalid CSS unit"
-            }, {
-                "id": "CSS-020",
-                "type": "missing_bracket",
-                "difficulty": "easy",
-                "original": ".btn-outline {",
-                "modified": ".btn-outline ",
-                "description": "Missing CSS bracket"
-            }, {
-                "id": "CSS-021",
-                "type": "invalid_variable",
-                "difficulty": "medium",
-                "original": "var(--bs-primary)",
-                "modified": "var(--bs-primaryX)",
-                "description": "Invalid CSS variable name"
-            }, {
-                "id": "CSS-022",
-                "type": "missing_colon",
-                "difficulty": "easy",
-                "original": "color:",
-                "modified": "color ",
-                "description": "Missing colon in color property"
-            }, {
-                "id": "CSS-023",
-                "type": "invalid_selector",
-                "difficulty": "medium",
-                "original": ".product-item",
-                "modified": ".product-item$",
-                "description": "Invalid product-item selector"
-            }, {
-                "id": "CSS-024",
-                "type": "media_query_typo",
-                "difficulty": "medium",
-                "original": "@media (max-width: 991.98px)",
-                "modified": "@mdia (max-width: 991.98px)",
-                "description": "Typo in media query"
-            }, {
-                "id": "CSS-025",
-                "type": "flexbox_typo",
-                "difficulty": "medium",
-                "original": "align-items:",
-                "modified": "align-item:",
-                "description": "Typo in align-items property"
-            }, {
-                "id": "CSS-026",
-                "type": "pseudo_class_typo",
-                "difficulty": "medium",
-                "original": ":hover",
-                "modified": ":hove",
-                "description": "Typo in hover pseudo-class"
-            }, {
-                "id": "CSS-027",
-                "type": "variable_syntax",
-                "difficulty": "hard",
-                "original": "var(--bs-secondary)",
-                "modified": "var(-bs-secondary)",
-                "description": "CSS variable syntax error"
-            }, {
-                "id": "CSS-028",
-                "type": "transform_typo",
-                "difficulty": "hard",
-                "original": "translateY",
-                "modified": "translateX",
-                "description": "Wrong transform function"
-            }, {
-                "id": "CSS-029",
-                "type": "important_typo",
-                "difficulty": "hard",
-                "original": "!important",
-                "modified": "!importan",
-                "description": "Typo in !important declaration"
-            }, {
-                "id": "CSS-030",
-                "type": "invalid_percentage",
-                "difficulty": "hard",
-                "original": "100%",
-                "modified": "100percent",
-                "description": "Invalid percentage unit"
-            }]
-        },
-        4: {
-            "template_name":
-            "seo-agency-website-template",
-            "site_id":
-            4,
-            "total_bugs":
-            30,
-            "html_bugs":
-            15,
-            "css_bugs":
-            15,
-            "bugs": [{
-                "id": "HTML-001",
-                "type": "missing_doctype",
-                "difficulty": "easy",
-                "original": "<!DOCTYPE html>",
-                "modified": "",
-                "description": "Removed DOCTYPE declaration"
-            }, {
-                "id": "HTML-002",
-                "type": "invalid_tag",
-                "difficulty": "medium",
-                "original": "<body>",
-                "modified": "<bod>",
-                "description": "Changed body to bod"
-            }, {
-                "id": "HTML-003",
-                "type": "missing_closing_tag",
-                "difficulty": "easy",
-                "original": "</div>\n    <!-- Service End -->",
-                "modified": "\n    <!-- Service End -->",
-                "description": "Missing closing div in service section"
-            }, {
-                "id": "HTML-004",
-                "type": "attribute_typo",
-                "difficulty": "easy",
-                "original": "class=\"navbar-nav",
-                "modified": "clas=\"navbar-nav",
-                "description": "Typo in class attribute"
-            }, {
-                "id": "HTML-005",
-                "type": "missing_quotes",
-                "difficulty": "easy",
-                "original": "class=\"btn btn-primary\"",
-                "modified": "class=btn btn-primary",
-                "description": "Missing quotes in class attribute"
-            }, {
-                "id": "HTML-006",
-                "type": "tag_typo",
-                "difficulty": "easy",
-                "original": "<div class=\"container\">",
-                "modified": "<dvi class=\"container\">",
-                "description": "Changed div to dvi"
-            }, {
-                "id": "HTML-007",
-                "type": "missing_alt",
-                "difficulty": "easy",
-                "original": "alt=\"\"",
-                "modified": "",
-                "description": "Removed alt attribute"
-            }, {
-                "id": "HTML-008",
-                "type": "broken_href",
-                "difficulty": "easy",
-                "original": "href=\"#service\"",
-                "modified": "href=\"#servic\"",
-                "description": "Broken service link"
-            }, {
-                "id": "HTML-009",
-                "type": "extra_space",
-                "difficulty": "medium",
-                "original": "<div class=\"row\">",
-                "modified": "< div class=\"row\">",
-                "description": "Extra space in div tag"
-            }, {
-                "id": "HTML-010",
-                "type": "missing_bracket",
-                "difficulty": "medium",
-                "original": "<div class=\"col-lg-6\">",
-                "modified": "<div class=\"col-lg-6\"",
-                "description": "Missing closing bracket"
-            }, {
-                "id": "HTML-011",
-                "type": "nested_mismatch",
-                "difficulty": "medium",
-                "original": "<h2>SEO Services</h2>",
-                "modified": "<h2>SEO Services</div>",
-                "description": "Mismatched nested tags"
-            }, {
-                "id": "HTML-012",
-                "type": "missing_meta",
-                "difficulty": "medium",
-                "original":
-                "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">",
-                "modified": "",
-                "description": "Removed viewport meta tag"
-            }, {
-                "id": "HTML-013",
-                "type": "broken_comment",
-                "difficulty": "hard",
-                "original": "<!-- Service Start -->",
-                "modified": "<!- Service Start -->",
-                "description": "Broken HTML comment"
-            }, {
-                "id": "HTML-014",
-                "type": "invisible_char",
-                "difficulty": "hard",
-                "original": "Read More",
-                "modified": "Read\u200BMore",
-                "description": "Invisible character injection"
-            }, {
-                "id": "HTML-015",
-                "type": "self_closing",
-                "difficulty": "hard",
-                "original": "<br>",
-                "modified": "<br />",
-                "description": "Self-closing tag formatting"
-            }, {
-                "id": "CSS-016",
-                "type": "missing_semicolon",
-                "difficulty": "easy",
-                "original": "opacity: 0;",
-                "modified": "opacity: 0",
-                "description": "Missing semicolon in opacity"
-            }, {
-                "id": "CSS-017",
-                "type": "missing_brace",
-                "difficulty": "medium",
-                "original": "z-index: 99999;\n}",
-                "modified": "z-index: 99999;\n",
-                "description": "Missing closing brace"
-            }, {
-                "id": "CSS-018",
-                "type": "property_typo",
-                "difficulty": "easy",
-                "original": "background:",
-                "modified": "backgrund:",
-                "description": "Typo in background property"
-            }, {
-                "id": "CSS-019",
-                "type": "invalid_unit",
-                "difficulty": "easy",
-                "original": "38px",
-                "modified": "38pix",
-                "description": "Invalid CSS unit"
-            }, {
-                "id": "CSS-020",
-                "type": "missing_bracket",
-                "difficulty": "easy",
-                "original": ".btn-square {",
-                "modified": ".btn-square ",
-                "description": "Missing CSS bracket"
-            }, {
-                "id": "CSS-021",
-                "type": "invalid_variable",
-                "difficulty": "medium",
-                "original": "var(--primary)",
-                "modified": "var(--primaryX)",
-                "description": "Invalid CSS variable name"
-            }, {
-                "id": "CSS-022",
-                "type": "missing_colon",
-                "difficulty": "easy",
-                "original": "color:",
-                "modified": "color ",
-                "description": "Missing colon in color property"
-            }, {
-                "id": "CSS-023",
-                "type": "invalid_selector",
-                "difficulty": "medium",
-                "original": ".service-item",
-                "modified": ".service-item$",
-                "description": "Invalid service-item selector"
-            }, {
-                "id": "CSS-024",
-                "type": "media_query_typo",
-                "difficulty": "medium",
-                "original": "@media (max-width: 991.98px)",
-                "modified": "@mdia (max-width: 991.98px)",
-                "description": "Typo in media query"
-            }, {
-                "id": "CSS-025",
-                "type": "flexbox_typo",
-                "difficulty": "medium",
-                "original": "justify-content:",
-                "modified": "justify-conten:",
-                "description": "Typo in flexbox property"
-            }, {
-                "id": "CSS-026",
-                "type": "pseudo_class_typo",
-                "difficulty": "medium",
-                "original": ":hover",
-                "modified": ":hove",
-                "description": "Typo in hover pseudo-class"
-            }, {
-                "id": "CSS-027",
-                "type": "variable_syntax",
-                "difficulty": "hard",
-                "original": "var(--secondary)",
-                "modified": "var(-secondary)",
-                "description": "CSS variable syntax error"
-            }, {
-                "id": "CSS-028",
-                "type": "transition_typo",
-                "difficulty": "hard",
-                "original": "transition:",
-                "modified": "transitio:",
-                "description": "Typo in transition property"
-            }, {
-                "id": "CSS-029",
-                "type": "important_typo",
-                "difficulty": "hard",
-                "original": "!important",
-                "modified": "!importan",
-                "description": "Typo in !important declaration"
-            }, {
-                "id": "CSS-030",
-                "type": "invalid_percentage",
-                "difficulty": "hard",
-                "original": "100%",
-                "modified": "100percent",
-                "description": "Invalid percentage unit"
-            }]
-        },
-        5: {
-            "template_name":
-            "stock-market-website-template",
-            "site_id":
-            5,
-            "total_bugs":
-            30,
-            "html_bugs":
-            15,
-            "css_bugs":
-            15,
-            "bugs": [{
-                "id": "HTML-001",
-                "type": "missing_doctype",
-                "difficulty": "easy",
-                "original": "<!DOCTYPE html>",
-                "modified": "",
-                "description": "Removed DOCTYPE declaration"
-            }, {
-                "id": "HTML-002",
-                "type": "invalid_tag",
-                "difficulty": "medium",
-                "original": "<body>",
-                "modified": "<bod>",
-                "description": "Changed body to bod"
-            }, {
-                "id":
-                "HTML-003",
-                "type":
-                "missing_closing_tag",
-                "difficulty":
-                "easy",
-                "original":
-                "</div>\n    <!-- Testimonial End -->",
-                "modified":
-                "\n    <!-- Testimonial End -->",
-                "description":
-                "Missing closing div in testimonial section"
-            }, {
-                "id": "HTML-004",
-                "type": "attribute_typo",
-                "difficulty": "easy",
-                "original": "class=\"navbar-nav",
-                "modified": "clas=\"navbar-nav",
-                "description": "Typo in class attribute"
-            }, {
-                "id": "HTML-005",
-                "type": "missing_quotes",
-                "difficulty": "easy",
-                "original": "class=\"btn btn-primary\"",
-                "modified": "class=btn btn-primary",
-                "description": "Missing quotes in class attribute"
-            }, {
-                "id": "HTML-006",
-                "type": "tag_typo",
-                "difficulty": "easy",
-                "original": "<div class=\"container\">",
-                "modified": "<dvi class=\"container\">",
-                "description": "Changed div to dvi"
-            }, {
-                "id": "HTML-007",
-                "type": "missing_alt",
-                "difficulty": "easy",
-                "original": "alt=\"\"",
-                "modified": "",
-                "description": "Removed alt attribute"
-            }, {
-                "id": "HTML-008",
-                "type": "broken_href",
-                "difficulty": "easy",
-                "original": "href=\"#team\"",
-                "modified": "href=\"#tea\"",
-                "description": "Broken team link"
-            }, {
-                "id": "HTML-009",
-                "type": "extra_space",
-                "difficulty": "medium",
-                "original": "<div class=\"row\">",
-                "modified": "< div class=\"row\">",
-                "description": "Extra space in div tag"
-            }, {
-                "id": "HTML-010",
-                "type": "missing_bracket",
-                "difficulty": "medium",
-                "original": "<div class=\"col-lg-6\">",
-                "modified": "<div class=\"col-lg-6\"",
-                "description": "Missing closing bracket"
-            }, {
-                "id": "HTML-011",
-                "type": "nested_mismatch",
-                "difficulty": "medium",
-                "original": "<h4>Profession</h4>",
-                "modified": "<h4>Profession</div>",
-                "description": "Mismatched nested tags"
-            }, {
-                "id": "HTML-012",
-                "type": "missing_meta",
-                "difficulty": "medium",
-                "original":
-                "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">",
-                "modified": "",
-                "description": "Removed viewport meta tag"
-            }, {
-                "id": "HTML-013",
-                "type": "broken_comment",
-                "difficulty": "hard",
-                "original": "<!-- Team Start -->",
-                "modified": "<!- Team Start -->",
-                "description": "Broken HTML comment"
-            }, {
-                "id": "HTML-014",
-                "type": "invisible_char",
-                "difficulty": "hard",
-                "original": "Learn More",
-                "modified": "Learn\u200BMore",
-                "description": "Invisible character in Learn More"
-            }, {
-                "id": "HTML-015",
-                "type": "self_closing",
-                "difficulty": "hard",
-                "original": "<br>",
-                "modified": "<br />",
-                "description": "Self-closing tag formatting"
-            }, {
-                "id": "CSS-016",
-                "type": "missing_semicolon",
-                "difficulty": "easy",
-                "original": "opacity: 0;",
-                "modified": "opacity: 0",
-                "description": "Missing semicolon in opacity"
-            }, {
-                "id": "CSS-017",
-                "type": "missing_brace",
-                "difficulty": "medium",
-                "original": "z-index: 99999;\n}",
-                "modified": "z-index: 99999;\n",
-                "description": "Missing closing brace"
-            }, {
-                "id": "CSS-018",
-                "type": "property_typo",
-                "difficulty": "easy",
-                "original": "background:",
-                "modified": "backgrund:",
-                "description": "Typo in background property"
-            }, {
-                "id": "CSS-019",
-                "type": "invalid_unit",
-                "difficulty": "easy",
-                "original": "32px",
-                "modified": "32pix",
-                "description": "Invalid CSS unit"
-            }, {
-                "id": "CSS-020",
-                "type": "missing_bracket",
-                "difficulty": "easy",
-                "original": ".btn-square {",
-                "modified": ".btn-square ",
-                "description": "Missing CSS bracket"
-            }, {
-                "id": "CSS-021",
-                "type": "invalid_variable",
-                "difficulty": "medium",
-                "original": "var(--bs-white)",
-                "modified": "var(--bs-whiteX)",
-                "description": "Invalid CSS variable name"
-            }, {
-                "id": "CSS-022",
-                "type": "missing_colon",
-                "difficulty": "easy",
-                "original": "color:",
-                "modified": "color ",
-                "description": "Missing colon in color property"
-            }, {
-                "id": "CSS-023",
-                "type": "invalid_selector",
-                "difficulty": "medium",
-                "original": ".team-item",
-                "modified": ".team-item$",
-                "description": "Invalid team-item selector"
-            }, {
-                "id": "CSS-024",
-                "type": "media_query_typo",
-                "difficulty": "medium",
-                "original": "@media (max-width: 991.98px)",
-                "modified": "@mdia (max-width: 991.98px)",
-                "description": "Typo in media query"
-            }, {
-                "id": "CSS-025",
-                "type": "flexbox_typo",
-                "difficulty": "medium",
-                "original": "justify-content:",
-                "modified": "justify-conten:",
-                "description": "Typo in flexbox property"
-            }, {
-                "id": "CSS-026",
-                "type": "pseudo_class_typo",
-                "difficulty": "medium",
-                "original": ":hover",
-                "modified": ":hove",
-                "description": "Typo in hover pseudo-class"
-            }, {
-                "id": "CSS-027",
-                "type": "variable_syntax",
-                "difficulty": "hard",
-                "original": "var(--bs-primary)",
-                "modified": "var(-bs-primary)",
-                "description": "CSS variable syntax error"
-            }, {
-                "id": "CSS-028",
-                "type": "transform_typo",
-                "difficulty": "hard",
-                "original": "transform:",
-                "modified": "transfor:",
-                "description": "Typo in transform property"
-            }, {
-                "id": "CSS-029",
-                "type": "important_typo",
-                "difficulty": "hard",
-                "original": "!important",
-                "modified": "!importan",
-                "description": "Typo in !important declaration"
-            }, {
-                "id": "CSS-030",
-                "type": "invalid_percentage",
-                "difficulty": "hard",
-                "original": "100%",
-                "modified": "100percent",
-                "description": "Invalid percentage unit"
-            }]
-        }
-    }
-
-    return bug_logs.get(site_id)
+from bug_plan import SCORING_ENGINE, compile_plan
+from bug_pack import bug_packs
+from score_cache import cached_run_plan, content_hash
+from site_registry import registry as site_registry
+from variants import variants
 
 
 def load_bug_log(site_id):
-    """Load bug log for a specific site - now uses hardcoded data"""
-    return get_hardcoded_bug_log(site_id)
+    """Bug log (the site's bug pack) for a site, or None if it has none"""
+    loaded = bug_packs.get(site_id)
+    return loaded.pack if loaded else None
+
+
+# Kept for callers written against the old hardcoded logs
+get_hardcoded_bug_log = load_bug_log
+
+
+# Compiled verification plans, rebuilt when the site's bug pack changes
+_site_plans = {}
+
+
+def get_site_plan(site_id):
+    """Get the compiled verification plan for a site (None if no bug pack)"""
+    loaded = bug_packs.get(site_id)
+    if loaded is None:
+        return None
+    cached = _site_plans.get(loaded.site_id)
+    if cached is not None and cached[0] is loaded:
+        return cached[1]
+    plan = compile_plan(loaded.site_id, loaded.pack)
+    _site_plans[loaded.site_id] = (loaded, plan)
+    return plan
+
+
+def plan_for(site_id, team=None):
+    """The plan a team is scored against: its own variant's, else the site's"""
+    if team is not None:
+        plan = variants.plan(site_id, team)
+        if plan is not None:
+            return plan
+    return get_site_plan(site_id)
+
+
+def build_all_plans():
+    """Compile every site's plan up front and report build time and checker counts"""
+    for site_id in bug_packs.site_ids():
+        plan = get_site_plan(site_id)
+        if plan is None:
+            continue
+        if SCORING_ENGINE == 'automaton':
+            # Built before the scoring workers fork, so they share it
+            plan.matcher.build()
+        print(f"Compiled plan for site {site_id}: {len(plan.checks)} checkers "
+              f"in {plan.build_seconds * 1000:.2f} ms")
+    return plan_stats()
+
+
+def reload_bug_packs():
+    """Re-read every bug pack that changed on disk and rebuild its plan
+
+    Returns per-site load status. Scoring workers pick up the same change
+    on their next submission, since every plan lookup checks the pack file.
+    """
+    status = bug_packs.reload()
+    for site_id in list(_site_plans):
+        if site_id not in status:
+            del _site_plans[site_id]
+    for site_id, site_status in status.items():
+        plan = get_site_plan(site_id)
+        site_status["version"] = plan.version if plan else None
+    return status
+
+
+def plan_stats():
+    """Per-site build time and checker counts of the compiled plans"""
+    return {
+        site_id: {
+            "checkers": len(plan.checks),
+            "build_ms": round(plan.build_seconds * 1000, 3),
+            "version": plan.version
+        }
+        for site_id, (_, plan) in sorted(_site_plans.items())
+    }
 
 
 def verify_specific_bugs(content, bug_list):
@@ -1189,9 +136,12 @@ def verify_specific_bugs(content, bug_list):
                 wrong_prop = modified.split(":")[0]
                 is_fixed = correct_prop in content and wrong_prop not in content
 
-        # Generic check: if modified (buggy) code is gone and original is present
+        # Generic check: if modified (buggy) code is gone and original is present. When the
+        # buggy text is part of the original ("\n<!-- End -->" of "</div>\n<!-- End -->"),
+        # only copies outside an original count
         elif modified and original:
-            is_fixed = (modified not in content) and (original in content)
+            is_fixed = (original in content and
+                        content.count(modified) <= content.count(original) * original.count(modified))
 
         elif original:
             is_fixed = original in content
@@ -1203,116 +153,142 @@ def verify_specific_bugs(content, bug_list):
     return score, fixed_bugs
 
 
-def check_all_fixes(folder, expected_site_id):
-    """Enhanced check fixes with real bug verification using hardcoded logs"""
-    score = 0
+# Files required by the fallback scoring when a site has no bug log
+FALLBACK_FILES = ['index.html', 'css/style.css']
 
+
+def _validate_site_id(expected_site_id):
+    """Return the site ID as int, or None if it is not a configured site"""
     # Convert expected_site_id to int if it's a string
     try:
         expected_site_id = int(expected_site_id)
     except (ValueError, TypeError):
-        return 0
+        return None
 
-    # Load site configuration (keep existing validation)
-    try:
-        sites_path = os.path.join('admin', 'sites.json')
-        if not os.path.exists(sites_path):
-            print(f"Warning: sites.json not found at {sites_path}")
-        else:
-            with open(sites_path, 'r') as f:
-                sites = json.load(f)
-
-            if str(expected_site_id) not in sites:
-                print(f"Invalid site ID: {expected_site_id}")
-                return 0
-    except Exception as e:
-        print(f"Error loading sites config: {e}")
-
-    # Check if folder exists
-    if not os.path.exists(folder):
-        print(f"Folder not found: {folder}")
-        return 0
+    # Cached site configuration (keep existing validation)
+    if not os.path.exists(site_registry.path):
+        print(f"Warning: sites.json not found at {site_registry.path}")
+    elif not site_registry.exists(expected_site_id):
+        print(f"Invalid site ID: {expected_site_id}")
+        return None
 
-    # Load hardcoded bug log
-    bug_data = load_bug_log(expected_site_id)
+    return expected_site_id
 
-    if bug_data:
-        # Real bug verification using hardcoded data
-        print(f"Using hardcoded bug verification for site {expected_site_id}")
 
-        # Read HTML and CSS files
-        html_content = ""
-        css_content = ""
+def required_files(site_id, team=None):
+    """Submission files the scorer needs to read for a site"""
+    plan = plan_for(site_id, team)
+    if plan is None:
+        return list(FALLBACK_FILES)
+    return list(plan.files)
 
-        html_file = os.path.join(folder, "index.html")
-        css_file = os.path.join(folder, "css", "style.css")
 
+def read_folder_files(folder, names):
+    """Read the named files from an extracted submission folder"""
+    contents = {}
+    for name in names:
+        path = os.path.join(folder, *name.split("/"))
+        if not os.path.exists(path):
+            continue
         try:
-            if os.path.exists(html_file):
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
+            with open(path, 'r', encoding='utf-8') as f:
+                contents[name] = f.read()
         except Exception as e:
-            print(f"Error reading HTML: {e}")
-
+            print(f"Error reading {name}: {e}")
+            contents[name] = ""
+    return contents
+
+
+def read_zip_files(zip_ref, names):
+    """Decode only the named members of an open ZIP archive"""
+    members = set(zip_ref.namelist())
+    contents = {}
+    for name in names:
+        if name not in members:
+            continue
         try:
-            if os.path.exists(css_file):
-                with open(css_file, 'r', encoding='utf-8') as f:
-                    css_content = f.read()
+            # TextIOWrapper gives the same newline handling as open()
+            with zip_ref.open(name) as raw:
+                contents[name] = io.TextIOWrapper(raw, encoding='utf-8').read()
         except Exception as e:
-            print(f"Error reading CSS: {e}")
-
-        # Verify HTML bugs
-        html_bugs = [
-            bug for bug in bug_data.get("bugs", [])
-            if bug.get("id", "").startswith("HTML")
-        ]
-        css_bugs = [
-            bug for bug in bug_data.get("bugs", [])
-            if bug.get("id", "").startswith("CSS")
-        ]
-
-        html_score, html_fixed = verify_specific_bugs(html_content, html_bugs)
-        css_score, css_fixed = verify_specific_bugs(css_content, css_bugs)
-
-        total_score = html_score + css_score
-        total_fixed = html_fixed + css_fixed
-        total_bugs = len(bug_data.get("bugs", []))
-
-        print(f"Site ID: {expected_site_id}")
-        print(
-            f"HTML bugs fixed: {html_fixed}/{len(html_bugs)} (Score: {html_score})"
-        )
-        print(
-            f"CSS bugs fixed: {css_fixed}/{len(css_bugs)} (Score: {css_score})"
-        )
+            print(f"Error reading {name}: {e}")
+            contents[name] = ""
+    return contents
+
+
+def load_submission(source, names):
+    """{file: text} of a submission, each distinct file read once
+
+    `source` is an open ZipFile or an extracted folder; `names` is the
+    manifest of files to score (the plan's files), any others are ignored.
+    """
+    names = list(dict.fromkeys(names))
+    if isinstance(source, zipfile.ZipFile):
+        return read_zip_files(source, names)
+    return read_folder_files(source, names)
+
+
+# Structured outcome of one scoring pass
+BugResult = namedtuple('BugResult', 'bug_id file description difficulty fixed points')
+ScoreResult = namedtuple(
+    'ScoreResult',
+    'site_id score total_bugs fixed_bugs bugs file_hashes plan_version elapsed_ms')
+
+
+def empty_result(site_id):
+    """Result for a submission that could not be scored"""
+    return ScoreResult(site_id, 0, 0, 0, (), {}, None, 0.0)
+
+
+def score_submission(contents, site_id, team=None):
+    """Score a submission given its file contents keyed by relative path"""
+    started = time.perf_counter()
+    score = 0
+
+    # Compiled plan for the team's variant, or the site's bug pack
+    plan = plan_for(site_id, team)
+
+    if plan:
+        # Real bug verification using the bug pack
+        print(f"Using bug pack verification for site {site_id}")
+
+        results, file_hashes = cached_run_plan(plan, contents)
+
+        bugs = tuple(
+            BugResult(check.bug_id, check.file, check.bug.get("description"),
+                      check.bug.get("difficulty"), fixed,
+                      check.points if fixed else 0)
+            for check, fixed in zip(plan.checks, results))
+
+        total_score = sum(bug.points for bug in bugs)
+        total_fixed = sum(1 for bug in bugs if bug.fixed)
+        total_bugs = len(bugs)
+
+        print(f"Site ID: {site_id}")
+        for file in plan.files:
+            file_bugs = [bug for bug in bugs if bug.file == file]
+            file_fixed = sum(1 for bug in file_bugs if bug.fixed)
+            file_score = sum(bug.points for bug in file_bugs)
+            print(
+                f"{file} bugs fixed: {file_fixed}/{len(file_bugs)} (Score: {file_score})"
+            )
         print(f"Total bugs fixed: {total_fixed}/{total_bugs}")
         print(f"Total score: {total_score}")
 
-        return total_score
+        return ScoreResult(site_id, total_score, total_bugs, total_fixed, bugs,
+                           file_hashes, plan.version,
+                           (time.perf_counter() - started) * 1000)
 
     else:
         # Fallback to original file-based scoring
-        print(f"Using fallback scoring for site {expected_site_id}")
-
-        # Updated for your actual template structure
-        site_files = {
-            1: ['index.html', 'css/style.css'],
-            2: ['index.html', 'css/style.css'],
-            3: ['index.html', 'css/style.css'],
-            4: ['index.html', 'css/style.css'],
-            5: ['index.html', 'css/style.css'],
-        }
-
-        required_files = site_files.get(expected_site_id,
-                                        ['index.html', 'css/style.css'])
+        print(f"Using fallback scoring for site {site_id}")
 
         # Score based on presence of required files
         found_files = []
         missing_files = []
 
-        for file in required_files:
-            file_path = os.path.join(folder, file)
-            if os.path.exists(file_path):
+        for file in FALLBACK_FILES:
+            if file in contents:
                 found_files.append(file)
                 if file.endswith('.html'):
                     score += 200  # Base score for HTML presence
@@ -1321,13 +297,83 @@ def check_all_fixes(folder, expected_site_id):
             else:
                 missing_files.append(file)
 
-        print(f"Site ID: {expected_site_id}")
-        print(f"Required files: {required_files}")
+        print(f"Site ID: {site_id}")
+        print(f"Required files: {FALLBACK_FILES}")
         print(f"Found files: {found_files}")
         print(f"Missing files: {missing_files}")
         print(f"Total score: {score}")
 
-        return score
+        file_hashes = {file: content_hash(contents[file]) for file in found_files}
+        return ScoreResult(site_id, score, 0, 0, (), file_hashes, None,
+                           (time.perf_counter() - started) * 1000)
+
+
+def score_contents(contents, site_id):
+    """Score a submission given its file contents; returns the total score"""
+    return score_submission(contents, site_id).score
+
+
+def progress_details(result):
+    """Detailed per-bug progress dict shown on /team/progress"""
+    details = [{
+        "id": bug.bug_id,
+        "description": bug.description,
+        "difficulty": bug.difficulty,
+        "status": "✅ Fixed" if bug.fixed else "❌ Not Fixed",
+        "score": bug.points
+    } for bug in result.bugs]
+
+    total_bugs = len(result.bugs)
+    fixed_count = sum(1 for bug in result.bugs if bug.fixed)
+
+    return {
+        "score":
+        sum(bug.points for bug in result.bugs),
+        "total_bugs":
+        total_bugs,
+        "fixed_bugs":
+        fixed_count,
+        "details":
+        details,
+        "percentage":
+        round((fixed_count / total_bugs) * 100, 1) if total_bugs > 0 else 0
+    }
+
+
+def check_all_fixes(folder, expected_site_id):
+    """Enhanced check fixes with real bug verification using bug packs"""
+    expected_site_id = _validate_site_id(expected_site_id)
+    if expected_site_id is None:
+        return 0
+
+    # Check if folder exists
+    if not os.path.exists(folder):
+        print(f"Folder not found: {folder}")
+        return 0
+
+    contents = load_submission(folder, required_files(expected_site_id))
+    return score_contents(contents, expected_site_id)
+
+
+def score_zip_submission(stream, expected_site_id, team=None):
+    """Score an uploaded ZIP straight from its file object, without extracting
+
+    Only the members the site's bug log needs are decoded; nothing is
+    written to disk. With `team`, the team's own site variant is used when
+    the site has variants. Returns a ScoreResult.
+    """
+    site_id = _validate_site_id(expected_site_id)
+    if site_id is None:
+        return empty_result(expected_site_id)
+
+    with zipfile.ZipFile(stream, 'r') as zip_ref:
+        contents = load_submission(zip_ref, required_files(site_id, team))
+    return score_submission(contents, site_id, team)
+
+
+def check_zip_fixes(stream, expected_site_id):
+    """Score an uploaded ZIP without extracting it; returns the total score"""
+    return score_zip_submission(stream, expected_site_id).score
 
 
 # Keep all your existing functions unchanged
@@ -1453,10 +499,8 @@ def run_test(participant_name, folder_path, expected_site_id):
 
 
 def get_detailed_results(folder_path, site_id):
-    """Get detailed bug checking results using hardcoded logs"""
-    bug_data = load_bug_log(site_id)
-
-    if not bug_data:
+    """Get detailed bug checking results using bug packs"""
+    if not get_site_plan(site_id):
         return {
             "score": 0,
             "total_bugs": 0,
@@ -1465,59 +509,8 @@ def get_detailed_results(folder_path, site_id):
             "percentage": 0
         }
 
-    # Read files
-    html_content = ""
-    css_content = ""
-
-    html_file = os.path.join(folder_path, "index.html")
-    css_file = os.path.join(folder_path, "css", "style.css")
-
-    try:
-        if os.path.exists(html_file):
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-        if os.path.exists(css_file):
-            with open(css_file, 'r', encoding='utf-8') as f:
-                css_content = f.read()
-    except Exception as e:
-        print(f"Error reading files: {e}")
-
-    # Check bugs
-    total_score = 0
-    fixed_count = 0
-    details = []
-
-    for bug in bug_data.get("bugs", []):
-        content_to_check = html_content if bug.get(
-            "id", "").startswith("HTML") else css_content
-        score, fixed = verify_specific_bugs(content_to_check, [bug])
-
-        if fixed > 0:
-            fixed_count += 1
-            total_score += score
-
-        details.append({
-            "id": bug.get("id"),
-            "description": bug.get("description"),
-            "difficulty": bug.get("difficulty"),
-            "status": "✅ Fixed" if fixed > 0 else "❌ Not Fixed",
-            "score": score
-        })
-
-    total_bugs = len(bug_data.get("bugs", []))
-
-    return {
-        "score":
-        total_score,
-        "total_bugs":
-        total_bugs,
-        "fixed_bugs":
-        fixed_count,
-        "details":
-        details,
-        "percentage":
-        round((fixed_count / total_bugs) * 100, 1) if total_bugs > 0 else 0
-    }
+    contents = load_submission(folder_path, required_files(site_id))
+    return progress_details(score_submission(contents, site_id))
 
 
 # Example usage
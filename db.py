@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+DATABASE = os.environ.get('DATABASE', 'database.db')
+BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000))
+WRITE_RETRIES = 5
+
+# Statements reused on every pooled connection; sqlite3 keeps them compiled
+# in each connection's statement cache, keyed by their SQL text
+SELECT_TEAM_SITE = "SELECT site_id FROM teams WHERE name = ?"
+UPSERT_SCORE = """INSERT INTO scores (name, score, duration, site_id, submitted_at) VALUES (?, ?, ?, ?, ?)
+                 ON CONFLICT(name) DO UPDATE SET score = excluded.score, duration = excluded.duration,
+                                                site_id = excluded.site_id, submitted_at = excluded.submitted_at
+                 WHERE scores.submitted_at IS NULL OR excluded.submitted_at >= scores.submitted_at"""
+INSERT_SUBMISSION = """INSERT OR IGNORE INTO submissions (id, team, site_id, score, fixed_bugs, total_bugs, duration,
+                                          plan_version, file_hashes, elapsed_ms, created_at)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+INSERT_BUG_RESULT = "INSERT OR IGNORE INTO submission_bug_results (submission_id, bug_id, site_id, fixed, points) VALUES (?, ?, ?, ?, ?)"
+SELECT_LEADERBOARD = "SELECT s.name, s.score, s.duration, s.site_id FROM scores s ORDER BY s.score DESC, s.duration ASC"
+
+_local = threading.local()
+_generation = 0
+
+
+def _open(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=256)
+    # WAL lets leaderboard readers run while a submission is being written
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT_MS)}")
+    return conn
+
+
+def connect(path=None):
+    """Return this thread's pooled connection, opening it on first use"""
+    path = path or DATABASE
+    pool = getattr(_local, 'pool', None)
+    if pool is None or _local.generation != _generation:
+        close_thread()
+        pool = _local.pool = {}
+        _local.generation = _generation
+    conn = pool.get(path)
+    if conn is None:
+        conn = pool[path] = _open(path)
+    return conn
+
+
+def release(conn):
+    """Hand a pooled connection back; uncommitted work is rolled back like close() did"""
+    if conn.in_transaction:
+        conn.rollback()
+
+
+def release_thread():
+    """Roll back anything this thread left open (request teardown)"""
+    for conn in getattr(_local, 'pool', {}).values():
+        release(conn)
+
+
+def close_thread():
+    """Close this thread's pooled connections"""
+    for conn in getattr(_local, 'pool', {}).values():
+        conn.close()
+    _local.pool = None
+
+
+def invalidate():
+    """Make every thread reopen its connections, e.g. after database.db was recreated"""
+    global _generation
+    _generation += 1
+
+
+def is_locked_error(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def with_retry(fn, retries=WRITE_RETRIES):
+    """Run fn(conn) in a transaction, retrying when the database stays locked"""
+    delay = 0.05
+    for attempt in range(retries + 1):
+        conn = connect()
+        try:
+            with conn:
+                return fn(conn)
+        except sqlite3.OperationalError as e:
+            if not is_locked_error(e) or attempt == retries:
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+
+def get_team_site(team_name):
+    """Site ID assigned to a team (1 if unknown)"""
+    conn = connect()
+    result = conn.execute(SELECT_TEAM_SITE, (team_name,)).fetchone()
+    release(conn)
+    return result[0] if result else 1
+
+
+def get_leaderboard_rows():
+    conn = connect()
+    rows = conn.execute(SELECT_LEADERBOARD).fetchall()
+    release(conn)
+    return rows
+
+
+def save_submission(job, result):
+    """Write a scored submission: the team's scores row plus full history
+
+    Workers finish in any order, so the scores row only moves to a newer
+    submission. Returns True if this one became the team's score.
+    """
+    submitted_at = job.get('submitted_at') or datetime.now().isoformat()
+
+    def write(conn):
+        # Upsert, so two workers finishing the same team's submissions can't both INSERT;
+        # an older submission finishing late leaves the newer score alone
+        cursor = conn.execute(UPSERT_SCORE, (job['team'], result.score, job['time_taken'], job['site_id'],
+                                             submitted_at))
+
+        # Keep the full history: one row per attempt and one per (attempt, bug). A job
+        # requeued after a restart may already be saved, so existing rows are kept
+        conn.execute(INSERT_SUBMISSION, (
+            job['id'], job['team'], job['site_id'], result.score, result.fixed_bugs, result.total_bugs,
+            job['time_taken'], result.plan_version, json.dumps(result.file_hashes), result.elapsed_ms,
+            submitted_at))
+        conn.executemany(INSERT_BUG_RESULT, [
+            (job['id'], bug.bug_id, job['site_id'], int(bug.fixed), bug.points) for bug in result.bugs])
+        return cursor.rowcount > 0
+
+    return with_retry(write)
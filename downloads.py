@@ -0,0 +1,113 @@
+import os
+import hashlib
+import tempfile
+import threading
+import zipfile
+
+# Built archives live outside uploads/ so submissions never touch them
+DOWNLOAD_FOLDER = os.environ.get('DOWNLOAD_FOLDER', os.path.join('build', 'downloads'))
+
+# Bug logs, detector scripts and backups stay on the server
+EXCLUDED_SUFFIXES = ('.py', '.pyc', '.backup', 'bug_log.json')
+
+
+def site_files(site_path):
+    """Sorted (archive name, path) pairs of the files teams get for a site"""
+    files = []
+    for root, dirs, names in os.walk(site_path):
+        for name in names:
+            if not name.endswith(EXCLUDED_SUFFIXES):
+                file_path = os.path.join(root, name)
+                files.append((os.path.relpath(file_path, site_path).replace(os.sep, '/'), file_path))
+    return sorted(files)
+
+
+def _stat_signature(files):
+    signature = []
+    for arc_name, file_path in files:
+        st = os.stat(file_path)
+        signature.append((arc_name, st.st_size, st.st_mtime_ns))
+    return tuple(signature)
+
+
+def content_hash(files):
+    """sha256 over every file's archive name and bytes"""
+    digest = hashlib.sha256()
+    for arc_name, file_path in files:
+        digest.update(arc_name.encode('utf-8') + b'\0')
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class DownloadCache:
+    """Per-site download ZIPs, built once per template content hash
+
+    A request only stats the template files; the content is re-hashed (and
+    the archive rebuilt) when a size or mtime changes. Builds for one site
+    are serialised, so a rush of downloads produces a single archive.
+    """
+
+    def __init__(self, folder=DOWNLOAD_FOLDER):
+        self.folder = folder
+        self._lock = threading.Lock()
+        self._site_locks = {}
+        # site_path -> (stat signature, content hash)
+        self._hashes = {}
+        self.builds = 0
+
+    def _site_lock(self, name):
+        with self._lock:
+            return self._site_locks.setdefault(name, threading.Lock())
+
+    def archive(self, site_id, site_path, name=None):
+        """(zip path, content hash) for a site, building the archive if needed
+
+        `name` keeps archives of different sources for one site apart (per-team
+        variants); it defaults to site_<id>.
+        """
+        name = name or f'site_{site_id}'
+        with self._site_lock(name):
+            files = site_files(site_path)
+            signature = _stat_signature(files)
+            cached = self._hashes.get(site_path)
+            if cached and cached[0] == signature:
+                digest = cached[1]
+            else:
+                digest = content_hash(files)
+                self._hashes[site_path] = (signature, digest)
+
+            zip_path = os.path.join(self.folder, f'{name}-{digest[:16]}.zip')
+            if not os.path.exists(zip_path):
+                self._build(name, files, zip_path)
+            return zip_path, digest
+
+    def _build(self, name, files, zip_path):
+        os.makedirs(self.folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix='.building-', suffix='.zip')
+        try:
+            with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for arc_name, file_path in files:
+                    zipf.write(file_path, arc_name)
+            os.replace(tmp_path, zip_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.builds += 1
+        print(f"Built download archive {name}: {zip_path} ({len(files)} files)")
+
+        # Older archives of this source are no longer served
+        prefix = f'{name}-'
+        for entry in os.listdir(self.folder):
+            old_path = os.path.join(self.folder, entry)
+            if entry.startswith(prefix) and entry.endswith('.zip') and old_path != zip_path:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+
+download_cache = DownloadCache()
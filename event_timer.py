@@ -0,0 +1,101 @@
+import os
+import json
+import tempfile
+import threading
+from datetime import datetime
+
+STATUS_FILE = os.path.join('admin', 'status.json')
+STOPPED = {"status": "stopped", "start_time": None, "duration": 0}
+
+
+class EventTimer:
+    """Event clock kept in memory and persisted atomically to admin/status.json
+
+    The file is only re-read when its mtime/size/inode change (e.g. edited
+    by hand or written by another process), and every write goes through a
+    temp file plus os.replace, so readers never see a half-written file.
+    """
+
+    def __init__(self, path=STATUS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = dict(STOPPED)
+        self._stamp = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self):
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        state = dict(STOPPED)
+        if stamp is not None:
+            try:
+                with open(self.path) as f:
+                    state.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Error loading timer status: {e}")
+                return
+        self._state = state
+        self._stamp = stamp
+
+    def _save(self, state):
+        folder = os.path.dirname(self.path) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.status-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._state = state
+        self._stamp = self._file_stamp()
+
+    def state(self):
+        """Current timer status dict: status, start_time, duration (minutes)"""
+        with self._lock:
+            self._refresh()
+            return dict(self._state)
+
+    @staticmethod
+    def remaining_for(state, now=None):
+        """Seconds left on the clock for a status dict (0 when not running)"""
+        if state.get('status') != 'running' or not state.get('start_time'):
+            return 0
+        now = now or datetime.now()
+        elapsed = (now - datetime.fromisoformat(state['start_time'])).total_seconds()
+        return max(0, int(state['duration']) * 60 - int(elapsed))
+
+    def snapshot(self, now=None):
+        """(state, remaining seconds, active) computed from one consistent read"""
+        state = self.state()
+        remaining = self.remaining_for(state, now)
+        return state, remaining, remaining > 0
+
+    def start(self, minutes):
+        with self._lock:
+            self._save({"status": "running", "start_time": datetime.now().isoformat(), "duration": minutes})
+            return dict(self._state)
+
+    def stop(self):
+        with self._lock:
+            self._refresh()
+            state = dict(self._state, status="stopped")
+            self._save(state)
+            return dict(state)
+
+    def reset(self):
+        with self._lock:
+            self._save(dict(STOPPED))
+            return dict(self._state)
+
+
+timer = EventTimer()
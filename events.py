@@ -0,0 +1,68 @@
+import json
+import queue
+import threading
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_BACKLOG = 100
+
+
+class EventBroker:
+    """Fans server-sent events out to every connected client
+
+    Each event is serialised once and handed to every subscriber's queue,
+    so the work per event does not depend on how many viewers there are,
+    and viewers themselves cost no database work at all. A subscriber
+    that stops reading is dropped once its backlog is full.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._event_id = 0
+
+    def publish(self, event, data):
+        with self._lock:
+            self._event_id += 1
+            message = f"id: {self._event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    self._subscribers.discard(subscriber)
+
+    def subscribe(self, subscriber=None):
+        """Register a subscriber: anything with put_nowait() raising queue.Full"""
+        if subscriber is None:
+            subscriber = queue.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def is_subscribed(self, subscriber):
+        return subscriber in self._subscribers
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def stream(self):
+        """Generator of SSE messages for one client, with keep-alive comments"""
+        subscriber = self.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield subscriber.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    if not self.is_subscribed(subscriber):
+                        # Dropped for falling behind; end the stream so the browser reconnects
+                        return
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broker = EventBroker()
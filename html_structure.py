@@ -0,0 +1,246 @@
+"""Token-level (structural) checks for HTML bugs.
+
+Substring checks judge `<h1>Clean Water</h1>` or a missing `</div>` by
+their exact bytes, so a correct fix that was reformatted scores nothing.
+In the "structural" scoring engine these bug types are instead answered
+from html.parser tokens: tag names and attribute names are case-folded,
+attribute order and quoting are ignored and whitespace-only text between
+tags is skipped, so only tag balance, nesting and attribute presence
+count.
+
+A bug snippet compiles to a TokenPattern: its token sequence plus the
+words that must appear verbatim in any matching markup. Scoring a file
+finds the rarest of those words with str.find and tokenizes only the
+markup around each hit; hits and windows are cached per file, so every
+HTML bug of a site is served from one HTMLStructure and no region is
+tokenized twice. Tokenized windows are also kept across files, since
+submissions for one site differ from its template in a few places. Running html.parser over the whole file instead costs
+~25x the substring engine.
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from collections import namedtuple
+from html import unescape
+from html.parser import HTMLParser
+
+# Bug types whose original/modified snippets are judged on tokens
+STRUCTURAL_TYPES = ('missing_closing_tag', 'nested_mismatch', 'tag_typo', 'broken_href')
+
+# A bare attribute snippet such as href="#about"
+ATTRIBUTE_RE = re.compile(r'''([a-zA-Z_:][\w:.-]*)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+ANCHOR_WORD_RE = re.compile(r'[\w#./-]{3,}')
+
+# tokens: token tuples, or ('attr', name, value) for "any start tag with this attribute";
+# anchors: (word, token index) pairs, words that must appear verbatim in matching markup
+TokenPattern = namedtuple('TokenPattern', 'tokens anchors')
+
+
+def _collapse(text):
+    return ' '.join(text.split())
+
+
+class _Tokenizer(HTMLParser):
+    """Normalised (line, column, token) stream of a piece of markup"""
+
+    def __init__(self):
+        # Character references are decoded here instead: html.parser is markedly
+        # slower on short windows with convert_charrefs
+        super().__init__(convert_charrefs=False)
+        self.tokens = []
+        self._text = []
+        self._text_pos = None
+
+    def _add(self, token):
+        if self._text:
+            self._flush()
+        line, column = self.getpos()
+        self.tokens.append((line, column, token))
+
+    def _flush(self):
+        data = _collapse(''.join(self._text))
+        if data:
+            self.tokens.append(self._text_pos + (('data', data),))
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        self._add(('start', tag, tuple(sorted((name, _collapse(value or '')) for name, value in attrs))))
+
+    handle_startendtag = handle_starttag
+
+    def handle_endtag(self, tag):
+        self._add(('end', tag))
+
+    def handle_data(self, data):
+        if not self._text:
+            self._text_pos = self.getpos()
+        self._text.append(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(unescape(f'&{name};'))
+
+    def handle_charref(self, name):
+        self.handle_data(unescape(f'&#{name};'))
+
+    def handle_comment(self, data):
+        self._add(('comment', _collapse(data)))
+
+    def handle_decl(self, decl):
+        self._add(('decl', _collapse(decl).lower()))
+
+    def close(self):
+        super().close()
+        if self._text:
+            self._flush()
+
+
+def tokenize(markup, complete=False):
+    """[(offset, token)] for a piece of markup
+
+    With `complete`, returns None if the markup ends inside a tag.
+    """
+    parser = _Tokenizer()
+    parser.feed(markup)
+    # feed() keeps back whatever it could not parse yet
+    if complete and parser.rawdata.lstrip().startswith('<'):
+        return None
+    parser.close()
+    line_starts = [0] + [m.end() for m in re.finditer('\n', markup)] if '\n' in markup else [0]
+    return [(line_starts[line - 1] + column, token) for line, column, token in parser.tokens]
+
+
+@lru_cache(maxsize=4096)
+def _window_tokens(markup):
+    """(offsets, tokens) of a window; cached, as submissions of one site share most windows"""
+    parsed = tokenize(markup)
+    return tuple(offset for offset, _ in parsed), tuple(token for _, token in parsed)
+
+
+def _token_words(token):
+    if token[0] == 'start':
+        return [word for _, value in token[2] for word in ANCHOR_WORD_RE.findall(value)]
+    if token[0] == 'attr':
+        return ANCHOR_WORD_RE.findall(token[2])
+    return ANCHOR_WORD_RE.findall(token[1]) if token[0] in ('data', 'comment') else []
+
+
+def compile_pattern(snippet):
+    """TokenPattern for a bug snippet, or None if it cannot be judged on tokens"""
+    snippet = snippet.strip()
+    attribute = ATTRIBUTE_RE.fullmatch(snippet)
+    if attribute:
+        value = attribute.group(2) if attribute.group(2) is not None else attribute.group(3)
+        tokens = (('attr', attribute.group(1).lower(), _collapse(unescape(value))),)
+    elif snippet.startswith('<') and snippet.endswith('>'):
+        parsed = tokenize(snippet, complete=True)
+        if not parsed:
+            return None
+        tokens = tuple(token for _, token in parsed)
+    else:
+        return None
+
+    # Snippets without a word to anchor on (href="#", a lone </div>) would need
+    # most of the file tokenized, so they stay substring checks
+    anchors = tuple(dict.fromkeys((word, index) for index, token in enumerate(tokens)
+                                  for word in _token_words(token)))
+    if not anchors:
+        return None
+    return TokenPattern(tokens, anchors)
+
+
+def _matches(expected, token):
+    if expected[0] == 'attr':
+        return token[0] == 'start' and (expected[1], expected[2]) in token[2]
+    return expected == token
+
+
+class HTMLStructure:
+    """Answers token-pattern questions about one HTML file"""
+
+    def __init__(self, text):
+        self.text = text
+        self._windows = {}
+        self._hits = {}
+        self._occurrences = {}
+
+    def _anchor_hits(self, anchor):
+        hits = self._hits.get(anchor)
+        if hits is None:
+            hits = self._hits[anchor] = []
+            pos = self.text.find(anchor)
+            while pos >= 0:
+                hits.append(pos)
+                pos = self.text.find(anchor, pos + 1)
+        return hits
+
+    def _window(self, pos, reach):
+        """(offsets, tokens) of the markup `reach` tag boundaries either side of pos"""
+        window = self._windows.get(pos)
+        # Patterns sharing an anchor share its window, tokenized once at the widest reach
+        if window is not None and window[0] >= reach:
+            return window[1], window[2]
+
+        text = self.text
+        start = pos
+        for _ in range(reach):
+            start = text.rfind('<', 0, start)
+            if start < 0:
+                start = 0
+                break
+        stop = pos
+        for _ in range(reach):
+            stop = text.find('>', stop) + 1
+            if stop == 0:
+                stop = len(text)
+                break
+        offsets, tokens = _window_tokens(text[start:stop])
+        offsets = [start + offset for offset in offsets]
+        self._windows[pos] = (reach, offsets, tokens)
+        return offsets, tokens
+
+    def occurrences(self, pattern):
+        """Every match of a pattern, as the tuple of its token offsets"""
+        found = self._occurrences.get(pattern)
+        if found is not None:
+            return found
+
+        # Tokenize around whichever anchor word is rarest in this file
+        word, index = min(pattern.anchors, key=lambda anchor: len(self._anchor_hits(anchor[0])))
+        # Enough tag boundaries on each side of the anchor to hold the whole pattern
+        reach = max(index, len(pattern.tokens) - index - 1) + 1
+        found = set()
+        for pos in self._anchor_hits(word):
+            offsets, tokens = self._window(pos, reach)
+            first = bisect_right(offsets, pos) - 1 - index
+            last = first + len(pattern.tokens)
+            if first >= 0 and last <= len(tokens) and all(map(_matches, pattern.tokens, tokens[first:last])):
+                found.add(tuple(offsets[first:last]))
+
+        self._occurrences[pattern] = found
+        return found
+
+    def fixed(self, original, modified):
+        """Original present, and every match of modified is part of an original match"""
+        originals = self.occurrences(original)
+        if not originals:
+            return False
+        if modified is None:
+            return True
+        covered = [set(match) for match in originals]
+        return all(any(set(match) <= spans for spans in covered) for match in self.occurrences(modified))
+
+
+def structural_checker(bug):
+    """Checker taking an HTMLStructure, or None if the bug stays substring-only"""
+    if bug.get('type') not in STRUCTURAL_TYPES or not bug.get('id', '').startswith('HTML'):
+        return None
+    original = compile_pattern(bug.get('original', ''))
+    if original is None:
+        return None
+    modified = None
+    if bug.get('modified', '').strip():
+        modified = compile_pattern(bug['modified'])
+        if modified is None:
+            return None
+    return lambda structure: structure.fixed(original, modified)
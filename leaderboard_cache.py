@@ -0,0 +1,91 @@
+import bisect
+import threading
+import uuid
+
+import db
+
+
+class Leaderboard:
+    """In-process ranked leaderboard, maintained on every score write
+
+    Rows are kept sorted by (score DESC, duration ASC, id) - the same
+    order as the old ORDER BY query - so a write only moves one entry.
+    Every change bumps `version`, which is what clients use as an ETag.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Changes on restart, so a browser's ETag never matches a different process
+        self._boot = uuid.uuid4().hex[:8]
+        self._keys = []
+        self._entries = {}
+        self._next_id = 0
+        self._loaded = False
+        self.version = 0
+
+    @staticmethod
+    def _key(name, score, duration, row_id):
+        return (-(score or 0), duration or 0, row_id, name)
+
+    def _insert(self, name, score, duration, site_id, row_id):
+        key = self._key(name, score, duration, row_id)
+        bisect.insort(self._keys, key)
+        self._entries[name] = (key, score, duration, site_id)
+
+    def reload(self):
+        """Rebuild from the scores table (after bulk admin edits or a reset)"""
+        conn = db.connect()
+        rows = conn.execute("SELECT id, name, score, duration, site_id FROM scores").fetchall()
+        db.release(conn)
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+            for row_id, name, score, duration, site_id in rows:
+                self._insert(name, score, duration, site_id, row_id)
+            self._next_id = max([row[0] for row in rows], default=0) + 1
+            self._loaded = True
+            self.version += 1
+
+    def record(self, name, score, duration, site_id):
+        """Apply one score write without touching the database
+
+        Returns (previous etag, new etag, rank); clients applying deltas use
+        the previous etag to detect an update they missed.
+        """
+        if not self._loaded:
+            self.reload()
+            with self._lock:
+                return self.etag(self.version - 1), self.etag(), self._rank(name)
+        with self._lock:
+            existing = self._entries.pop(name, None)
+            if existing:
+                key = existing[0]
+                self._keys.pop(bisect.bisect_left(self._keys, key))
+                row_id = key[2]
+            else:
+                row_id = self._next_id
+                self._next_id += 1
+            self._insert(name, score, duration, site_id, row_id)
+            self.version += 1
+            return self.etag(self.version - 1), self.etag(), self._rank(name)
+
+    def _rank(self, name):
+        entry = self._entries.get(name)
+        return bisect.bisect_left(self._keys, entry[0]) + 1 if entry else None
+
+    def snapshot(self):
+        """(etag, rows) where rows are (name, score, duration, site_id) in rank order"""
+        if not self._loaded:
+            self.reload()
+        with self._lock:
+            rows = []
+            for key in self._keys:
+                _, score, duration, site_id = self._entries[key[3]]
+                rows.append((key[3], score, duration, site_id))
+            return self.etag(), rows
+
+    def etag(self, version=None):
+        return f"lb-{self._boot}-{self.version if version is None else version}"
+
+
+leaderboard = Leaderboard()
@@ -1,14 +1,29 @@
-from flask import Flask, render_template, request, redirect, session, send_from_directory, jsonify
-import os, zipfile, shutil, json, sqlite3, csv, io, qrcode
-from datetime import datetime
-from bug_rules import check_all_fixes
+from flask import Flask, Response, render_template, request, redirect, session, send_from_directory, send_file, jsonify
+import os, json, csv, io, qrcode
+import db
+from leaderboard_cache import leaderboard as live_leaderboard
+from events import broker
+from event_timer import timer as event_timer
+from site_registry import registry as site_config, TEMPLATE_FOLDERS, DEFAULT_BUGS_COUNT
+from bug_rules import build_all_plans, reload_bug_packs, plan_for, progress_details, BugResult, ScoreResult
+from migrations import migrate
+from workspace import create_workspace
+from downloads import download_cache
+from variants import variants
+from upload_guard import MAX_UPLOAD_BYTES, SubmissionRejected, upload_metrics, validate_submission
+from scoring_queue import create_scoring_service
 
 app = Flask(__name__)
 app.secret_key = 'super-secret-key'
+# Oversized uploads are refused with 413 before Flask buffers them
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
 ADMIN_PASS = 'admin'
 
 UPLOAD_FOLDER = 'uploads'
 STATIC_FOLDER = 'static'
+# Set ARCHIVE_SUBMISSIONS=1 to keep an extracted copy of every submission under
+# uploads/<team>/ for manual inspection; scoring works from the queued ZIP bytes
+ARCHIVE_SUBMISSIONS = os.environ.get('ARCHIVE_SUBMISSIONS', '0') == '1'
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 if not os.path.exists(STATIC_FOLDER):
@@ -16,16 +31,6 @@ if not os.path.exists(STATIC_FOLDER):
 if not os.path.exists('static/qr'):
     os.makedirs('static/qr')
 
-# Template folder mapping for your actual template names
-TEMPLATE_FOLDERS = {
-    1: 'drinking-water-website-template',
-    2: 'mobile-app-html-template',
-    3: 'online-shop-website-template',
-    4: 'seo-agency-website-template',
-    5: 'stock-market-website-template'
-}
-
-
 def generate_qr_code(url, site_id):
     """Generate QR code for the given URL and save it for specific site"""
     try:
@@ -43,22 +48,108 @@ def generate_qr_code(url, site_id):
 
 
 def get_sites():
-    """Get all sites from configuration"""
-    try:
-        with open('admin/sites.json', 'r') as f:
-            return json.load(f)
-    except:
-        return {}
+    """Get all sites from configuration (cached until admin/sites.json changes)"""
+    return site_config.all()
 
 
 def get_team_site(team_name):
     """Get the site ID assigned to a team"""
-    conn = sqlite3.connect('database.db')
+    return db.get_team_site(team_name)
+
+
+def save_score(job, result):
+    """Store a scored submission in the scores table and the submission history"""
+    # False when a newer submission from this team already finished; its score stands
+    if db.save_submission(job, result):
+        previous, version, rank = live_leaderboard.record(job['team'], result.score, job['time_taken'],
+                                                          job['site_id'])
+
+        # One serialised message per change, fanned out to every /events client
+        broker.publish('leaderboard', {
+            "version": version,
+            "previous": previous,
+            "rank": rank,
+            "name": job['team'],
+            "score": result.score,
+            "time_taken": format_time(job['time_taken']),
+            "site": site_config.name(job['site_id'])
+        })
+    broker.publish('submission', {"id": job['id'], "status": "done", "score": result.score})
+
+
+def reload_leaderboard():
+    """Rebuild the leaderboard after bulk changes and tell clients to refetch it"""
+    live_leaderboard.reload()
+    broker.publish('leaderboard_reload', {"version": live_leaderboard.etag()})
+
+
+def get_latest_result(team_name):
+    """Rebuild the ScoreResult of a team's most recent submission from the database"""
+    conn = db.connect()
     c = conn.cursor()
-    c.execute("SELECT site_id FROM teams WHERE name = ?", (team_name,))
-    result = c.fetchone()
-    conn.close()
-    return result[0] if result else 1
+    c.execute("""SELECT id, site_id, score, fixed_bugs, total_bugs, file_hashes, plan_version, elapsed_ms
+                 FROM submissions WHERE team = ? ORDER BY created_at DESC LIMIT 1""", (team_name,))
+    row = c.fetchone()
+    if not row:
+        db.release(conn)
+        return None
+    c.execute("SELECT bug_id, fixed, points FROM submission_bug_results WHERE submission_id = ?", (row[0],))
+    bug_rows = c.fetchall()
+    db.release(conn)
+
+    # Descriptions and ordering come from the compiled plan the team was scored with
+    plan = plan_for(row[1], team_name)
+    checks = {check.bug_id: (i, check) for i, check in enumerate(plan.checks)} if plan else {}
+    bugs = []
+    for bug_id, fixed, points in bug_rows:
+        order, check = checks.get(bug_id, (len(checks), None))
+        bug = check.bug if check else {}
+        bugs.append((order, BugResult(bug_id, check.file if check else None, bug.get("description"),
+                                      bug.get("difficulty"), bool(fixed), points)))
+    bugs = tuple(bug for _, bug in sorted(bugs, key=lambda item: item[0]))
+
+    return ScoreResult(row[1], row[2], row[4], row[3], bugs, json.loads(row[5] or '{}'), row[6], row[7])
+
+
+def get_bug_fix_rates(site_id=None):
+    """Per-bug fix rate across all submissions, least fixed first"""
+    conn = db.connect()
+    c = conn.cursor()
+    query = """SELECT site_id, bug_id, COUNT(*), SUM(fixed) FROM submission_bug_results
+               {where} GROUP BY site_id, bug_id ORDER BY site_id, 1.0 * SUM(fixed) / COUNT(*), bug_id"""
+    if site_id is None:
+        c.execute(query.format(where=""))
+    else:
+        c.execute(query.format(where="WHERE site_id = ?"), (site_id,))
+    rows = c.fetchall()
+    db.release(conn)
+    return [{
+        'site_id': row[0],
+        'bug_id': row[1],
+        'attempts': row[2],
+        'fixed': row[3],
+        'fix_rate': round(100.0 * row[3] / row[2], 1) if row[2] else 0
+    } for row in rows]
+
+
+# Bring the database up to the latest schema before serving
+migrate(db.DATABASE)
+
+# Compile every site's verification plan once; forked scoring workers inherit them
+build_all_plans()
+scoring = create_scoring_service(on_scored=save_score)
+
+
+@app.before_request
+def start_scoring():
+    # Lazily started so the dev-server reloader parent never forks a pool
+    scoring.start()
+
+
+@app.teardown_request
+def release_db(exc):
+    # Pooled connections outlive the request; never leave a transaction open
+    db.release_thread()
 
 
 def format_time(seconds):
@@ -115,11 +206,11 @@ def login():
             session['admin'] = True
             return redirect('/admin/dashboard')
 
-        conn = sqlite3.connect('database.db')
+        conn = db.connect()
         c = conn.cursor()
         c.execute("SELECT password FROM teams WHERE name = ?", (name,))
         result = c.fetchone()
-        conn.close()
+        db.release(conn)
 
         if result and result[0] == pw:
             session['team'] = name
@@ -144,10 +235,8 @@ def bug_site():
 
     team_name = session['team']
     site_id = get_team_site(team_name)
-    sites = get_sites()
-
-    site_info = sites.get(str(site_id), {})
-    site_name = site_info.get('name', TEMPLATE_FOLDERS.get(site_id, f'Site {site_id}'))
+    site_info = site_config.get(site_id) or {}
+    site_name = site_config.name(site_id)
     drive_link = site_info.get('drive_link', '#')
 
     qr_path = f'static/qr/site_{site_id}.png'
@@ -179,24 +268,20 @@ def download_site(site_id):
     if not template_folder:
         return "Invalid site ID", 404
 
-    site_path = template_folder
+    # The team's own bug placements when the site has variants (built on first download)
+    variant = variants.ensure(site_id, team_name)
+    if variant:
+        seed, _ = variant
+        site_path, archive_name = variants.files_dir(site_id, seed), f'site_{site_id}_v{seed}'
+    else:
+        site_path, archive_name = template_folder, None
     if not os.path.exists(site_path):
         return "Site not found", 404
 
-    # Create ZIP file
-    zip_filename = f'site_{site_id}_{template_folder}_buggy_files.zip'
-    zip_path = os.path.join('uploads', zip_filename)
-
-    with zipfile.ZipFile(zip_path, 'w') as zipf:
-        for root, dirs, files in os.walk(site_path):
-            for file in files:
-                # Exclude bug logs and backup files from download
-                if not file.endswith(('.py', '.backup', 'bug_log.json')):
-                    file_path = os.path.join(root, file)
-                    arc_name = os.path.relpath(file_path, site_path)
-                    zipf.write(file_path, arc_name)
-
-    return send_from_directory('uploads', zip_filename, as_attachment=True)
+    # Prebuilt archive, rebuilt only when the template content changes
+    zip_path, digest = download_cache.archive(site_id, site_path, archive_name)
+    return send_file(zip_path, as_attachment=True, conditional=True, etag=digest,
+                     download_name=f'site_{site_id}_{template_folder}_buggy_files.zip')
 
 
 # ---- TEAM SUBMISSION PAGE ----
@@ -205,18 +290,8 @@ def index():
     if 'team' not in session:
         return redirect('/login')
 
-    timer_active = False
-    remaining = 0
-
-    if os.path.exists('admin/status.json'):
-        with open('admin/status.json') as f:
-            status = json.load(f)
-            if status['status'] == 'running' and status['start_time']:
-                elapsed = (datetime.now() - datetime.fromisoformat(status['start_time'])).total_seconds()
-                remaining = int(status['duration']) * 60 - int(elapsed)
-                timer_active = remaining > 0
-            else:
-                timer_active = False
+    # One consistent read of the in-memory event clock
+    status, remaining, timer_active = event_timer.snapshot()
 
     if request.method == 'POST':
         if not timer_active:
@@ -229,54 +304,115 @@ def index():
         teamname = session['team']
         team_site_id = get_team_site(teamname)
 
-        if os.path.exists(UPLOAD_FOLDER):
-            shutil.rmtree(UPLOAD_FOLDER)
-        os.makedirs(UPLOAD_FOLDER)
+        data = file.read()
+        try:
+            validate_submission(data)
+        except SubmissionRejected as e:
+            return render_template("index.html", error=str(e), timer_active=True, remaining=remaining)
 
-        zip_path = 'temp.zip'
-        file.save(zip_path)
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(UPLOAD_FOLDER)
-        os.remove(zip_path)
+        if ARCHIVE_SUBMISSIONS:
+            # Each submission gets its own workspace: uploads/<team>/<submission_id>/
+            create_workspace(teamname, data)
 
-        # Pass site ID to scoring function for validation
-        score = check_all_fixes(UPLOAD_FOLDER, team_site_id)
+        # Accept immediately; the scoring pool picks the job up from the queue
         time_taken = int(status['duration']) * 60 - remaining
+        submission_id = scoring.submit(teamname, team_site_id, time_taken, data)
 
-        conn = sqlite3.connect('database.db')
-        c = conn.cursor()
-        c.execute("SELECT id FROM scores WHERE name=?", (teamname,))
-        existing = c.fetchone()
-        if existing:
-            c.execute("UPDATE scores SET score=?, duration=?, site_id=? WHERE name=?", (score, time_taken, team_site_id, teamname))
-        else:
-            c.execute("INSERT INTO scores (name, score, duration, site_id) VALUES (?, ?, ?, ?)", (teamname, score, time_taken, team_site_id))
-        conn.commit()
-        conn.close()
-
-        return render_template("result.html", name=teamname, score=score, time_taken=format_time(time_taken))
+        return render_template("result.html", name=teamname, score=None, submission_id=submission_id, time_taken=format_time(time_taken))
 
     return render_template("index.html", timer_active=timer_active, remaining=remaining)
 
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    upload_metrics.record(0.0, 'too_large')
+    status, remaining, timer_active = event_timer.snapshot()
+    error = f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"
+    return render_template("index.html", error=error, timer_active=timer_active, remaining=remaining), 413
+
+
+# ---- SUBMISSION STATUS (polled by result.html) ----
+@app.route('/submission/<submission_id>/status')
+def submission_status(submission_id):
+    if 'team' not in session:
+        return jsonify({"error": "not logged in"}), 401
+
+    job = scoring.status(submission_id)
+    if not job or job['team'] != session['team']:
+        return jsonify({"error": "submission not found"}), 404
+
+    return jsonify({
+        "id": job['id'],
+        "status": job['status'],
+        "score": job['score'],
+        "time_taken": format_time(job['time_taken']),
+        "error": job['error']
+    })
+
+
+# ---- LIVE EVENTS (SSE) ----
+@app.route('/events')
+def events():
+    """Server-sent events: leaderboard deltas, timer changes and scored submissions"""
+    return Response(broker.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def publish_timer(status):
+    """Tell every connected page that the event clock changed"""
+    broker.publish('timer', {"status": status['status'], "remaining": event_timer.remaining_for(status)})
+
+
 # ---- PUBLIC LEADERBOARD ----
-@app.route('/leaderboard')
-def leaderboard():
-    conn = sqlite3.connect('database.db')
-    c = conn.cursor()
-    c.execute("SELECT s.name, s.score, s.duration, s.site_id FROM scores s ORDER BY s.score DESC, s.duration ASC")
-    rows = c.fetchall()
-    conn.close()
+# Rendered page for the current leaderboard version only
+_leaderboard_page = {}
 
-    sites = get_sites()
 
-    # Format time for display and add site names
+def format_leaderboard(rows):
+    """Format time for display and add site names"""
     formatted_rows = []
     for row in rows:
-        site_name = sites.get(str(row[3]), {}).get('name', TEMPLATE_FOLDERS.get(row[3], f'Site {row[3]}'))
-        formatted_rows.append((row[0], row[1], format_time(row[2]), site_name))
+        formatted_rows.append((row[0], row[1], format_time(row[2]), site_config.name(row[3])))
+    return formatted_rows
 
-    return render_template("leaderboard.html", rows=formatted_rows)
+
+
+@app.route('/leaderboard')
+def leaderboard():
+    # Unchanged since the client's last poll: nothing to query or render
+    etag = live_leaderboard.etag()
+    if request.if_none_match.contains(etag):
+        return '', 304
+
+    cached = _leaderboard_page.get(etag)
+    if cached is None:
+        etag, rows = live_leaderboard.snapshot()
+        cached = render_template("leaderboard.html", rows=format_leaderboard(rows), version=etag)
+        _leaderboard_page.clear()
+        _leaderboard_page[etag] = cached
+
+    response = app.make_response(cached)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/leaderboard.json')
+def leaderboard_json():
+    """Leaderboard rows for partial page refresh; 304 when nothing changed"""
+    etag = live_leaderboard.etag()
+    if request.if_none_match.contains(etag):
+        return '', 304
+
+    etag, rows = live_leaderboard.snapshot()
+    response = jsonify({
+        "version": etag,
+        "rows": [{"rank": rank, "name": row[0], "score": row[1], "time_taken": row[2], "site": row[3]}
+                 for rank, row in enumerate(format_leaderboard(rows), start=1)]
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 # ---- TEAM PROGRESS ROUTE ----
@@ -291,10 +427,11 @@ def team_progress():
     # Get template name for display
     template_name = TEMPLATE_FOLDERS.get(site_id, f'Site {site_id}')
 
-    from bug_rules import get_detailed_results
-    try:
-        details = get_detailed_results(UPLOAD_FOLDER, site_id)
-    except:
+    # Read the stored result of the team's last scored submission instead of rescoring
+    result = get_latest_result(team_name)
+    if result is not None:
+        details = progress_details(result)
+    else:
         details = {"score": 0, "total_bugs": 30, "fixed_bugs": 0, "details": [], "percentage": 0}
 
     return render_template('team_progress.html', 
@@ -334,25 +471,19 @@ def admin_sites():
                     'type': site_type,
                     'drive_link': drive_link,
                     'description': description,
-                    'bugs_count': sites.get(site_id, {}).get('bugs_count', 30),
+                    'bugs_count': sites.get(site_id, {}).get('bugs_count', DEFAULT_BUGS_COUNT),
                     'qr_path': f'static/qr/site_{site_id}.png'
                 }
 
-                # Ensure admin directory exists
-                if not os.path.exists('admin'):
-                    os.makedirs('admin')
-
-                with open('admin/sites.json', 'w') as f:
-                    json.dump(sites, f, indent=2)
-
                 # Regenerate QR code
                 qr_path = generate_qr_code(drive_link, site_id)
                 if qr_path:
                     sites[site_id]['qr_path'] = qr_path
-                    with open('admin/sites.json', 'w') as f:
-                        json.dump(sites, f, indent=2)
+                site_config.save(sites)
 
                 msg = f"✅ Site {site_id} ({template_name}) updated and QR code regenerated!"
+                # Site names are shown on the leaderboard
+                reload_leaderboard()
 
         elif action == 'regenerate_qr':
             site_id = request.form.get('site_id')
@@ -362,8 +493,7 @@ def admin_sites():
                     qr_path = generate_qr_code(drive_link, site_id)
                     if qr_path:
                         sites[site_id]['qr_path'] = qr_path
-                        with open('admin/sites.json', 'w') as f:
-                            json.dump(sites, f, indent=2)
+                        site_config.save(sites)
                         msg = f"🔄 QR code regenerated for Site {site_id}!"
 
         elif action == 'regenerate_all_qr':
@@ -376,8 +506,7 @@ def admin_sites():
                         sites[site_id]['qr_path'] = qr_path
                         regenerated += 1
 
-            with open('admin/sites.json', 'w') as f:
-                json.dump(sites, f, indent=2)
+            site_config.save(sites)
             msg = f"🔄 {regenerated} QR codes regenerated!"
 
         elif action == 'export_bug_reports':
@@ -385,16 +514,16 @@ def admin_sites():
             msg = result
 
         elif action == 'view_assignments':
-            conn = sqlite3.connect('database.db')
+            conn = db.connect()
             c = conn.cursor()
             c.execute("SELECT name, site_id FROM teams ORDER BY site_id, name")
             assignments = c.fetchall()
-            conn.close()
+            db.release(conn)
 
             team_assignments = []
             for team_name, site_id in assignments:
-                site_name = sites.get(str(site_id), {}).get('name', TEMPLATE_FOLDERS.get(site_id, f'Site {site_id}'))
-                template_folder = TEMPLATE_FOLDERS.get(site_id, 'Unknown')
+                site_name = site_config.name(site_id)
+                template_folder = site_config.template_folder(site_id, 'Unknown')
                 team_assignments.append({
                     'team_name': team_name,
                     'site_id': site_id,
@@ -404,8 +533,7 @@ def admin_sites():
 
     # Add template folder info to sites display
     for site_id_str, site_info in sites.items():
-        site_id_int = int(site_id_str)
-        site_info['template_folder'] = TEMPLATE_FOLDERS.get(site_id_int, 'Unknown')
+        site_info['template_folder'] = site_config.template_folder(site_id_str, 'Unknown')
 
     return render_template('admin_sites.html', msg=msg, sites=sites, team_assignments=team_assignments, template_folders=TEMPLATE_FOLDERS)
 
@@ -416,18 +544,17 @@ def admin_bug_analytics():
     if 'admin' not in session:
         return redirect('/login')
 
-    conn = sqlite3.connect('database.db')
+    conn = db.connect()
     c = conn.cursor()
     c.execute("SELECT name, score, site_id FROM scores ORDER BY score DESC")
     scores = c.fetchall()
-    conn.close()
+    db.release(conn)
 
-    sites = get_sites()
     analytics_data = []
 
     for team_name, score, site_id in scores:
-        site_name = sites.get(str(site_id), {}).get('name', TEMPLATE_FOLDERS.get(site_id, f'Site {site_id}'))
-        template_folder = TEMPLATE_FOLDERS.get(site_id, 'Unknown')
+        site_name = site_config.name(site_id)
+        template_folder = site_config.template_folder(site_id, 'Unknown')
 
         analytics_data.append({
             'team': team_name,
@@ -438,7 +565,26 @@ def admin_bug_analytics():
             'max_score': 900  # 30 bugs * 30 points max each
         })
 
-    return render_template('admin_bug_analytics.html', analytics=analytics_data)
+    return render_template('admin_bug_analytics.html', analytics=analytics_data, bug_fix_rates=get_bug_fix_rates())
+
+
+# ---- ADMIN BUG PACK HOT RELOAD ----
+@app.route('/admin/bug_packs/reload', methods=['POST'])
+def admin_reload_bug_packs():
+    """Pick up new or edited bug_packs/site_<id>.json files without a restart"""
+    if 'admin' not in session:
+        return redirect('/login')
+    status = reload_bug_packs()
+    errors = {site_id: s['error'] for site_id, s in status.items() if s['error']}
+    return jsonify({"sites": status, "errors": errors}), (422 if errors else 200)
+
+
+# ---- ADMIN UPLOAD METRICS ----
+@app.route('/admin/metrics/uploads')
+def admin_upload_metrics():
+    if 'admin' not in session:
+        return redirect('/login')
+    return jsonify(upload_metrics.snapshot())
 
 
 # ---- ADMIN DASHBOARD ----
@@ -448,7 +594,7 @@ def admin_dashboard():
         return redirect('/login')
 
     msg = ""
-    conn = sqlite3.connect('database.db')
+    conn = db.connect()
     c = conn.cursor()
 
     if request.method == 'POST':
@@ -456,40 +602,25 @@ def admin_dashboard():
 
         if action == "start_timer":
             mins = int(request.form.get('duration', 0))
-            status = {
-                "status": "running",
-                "start_time": datetime.now().isoformat(),
-                "duration": mins
-            }
-            # Ensure admin directory exists
-            if not os.path.exists('admin'):
-                os.makedirs('admin')
-            with open('admin/status.json', 'w') as f:
-                json.dump(status, f)
+            publish_timer(event_timer.start(mins))
             msg = f"▶ Timer started for {mins} minutes."
 
         elif action == "stop_timer":
-            with open('admin/status.json') as f:
-                status = json.load(f)
-            status["status"] = "stopped"
-            with open('admin/status.json', 'w') as f:
-                json.dump(status, f)
+            publish_timer(event_timer.stop())
             msg = "⏹ Timer stopped."
 
         elif action == "reset_timer":
-            status = {
-                "status": "stopped",
-                "start_time": None,
-                "duration": 0
-            }
-            with open('admin/status.json', 'w') as f:
-                json.dump(status, f)
+            publish_timer(event_timer.reset())
             msg = "🔄 Timer reset."
 
         elif action == "reset_scores":
+            # The submission history goes too, or the bug fix rates keep counting it
+            c.execute("DELETE FROM submission_bug_results")
+            c.execute("DELETE FROM submissions")
             c.execute("DELETE FROM scores")
             conn.commit()
-            msg = "🗑 Scores cleared."
+            reload_leaderboard()
+            msg = "🗑 Scores and submission history cleared."
 
         elif action == "update_scores":
             for key in request.form:
@@ -499,6 +630,7 @@ def admin_dashboard():
                     dur = request.form.get(f'duration_{uid}')
                     c.execute("UPDATE scores SET score=?, duration=? WHERE id=?", (score, dur, uid))
             conn.commit()
+            reload_leaderboard()
             msg = "✅ Scores updated."
 
         elif action == "add_team":
@@ -517,7 +649,12 @@ def admin_dashboard():
             name = request.form.get("teamname", "").strip()
             c.execute("DELETE FROM teams WHERE name = ?", (name,))
             c.execute("DELETE FROM scores WHERE name = ?", (name,))
+            # Foreign keys are not enforced, so ON DELETE CASCADE never fires
+            c.execute("""DELETE FROM submission_bug_results
+                         WHERE submission_id IN (SELECT id FROM submissions WHERE team = ?)""", (name,))
+            c.execute("DELETE FROM submissions WHERE team = ?", (name,))
             conn.commit()
+            reload_leaderboard()
             msg = f"🗑 Team '{name}' deleted."
 
         elif action == "change_password":
@@ -554,23 +691,23 @@ def admin_dashboard():
                 msg = f"📥 {added} team(s) imported from CSV."
 
         elif action == "reset_db":
-            conn.close()
+            db.release(conn)
             import subprocess
             subprocess.run(['python', 'reset_db.py'])
+            # database.db was recreated; pooled connections must reopen it
+            db.invalidate()
+            reload_leaderboard()
             msg = "💥 Database reset. All teams and scores removed."
             return redirect('/admin/dashboard')
 
     # Load timer status
-    timer = {"status": "stopped", "start_time": None, "duration": 0}
-    if os.path.exists('admin/status.json'):
-        with open('admin/status.json') as f:
-            timer = json.load(f)
+    timer = event_timer.state()
 
     c.execute("SELECT id, name, score, duration FROM scores ORDER BY score DESC")
     scores = c.fetchall()
     c.execute("SELECT name, password, site_id FROM teams ORDER BY name")
     teams = c.fetchall()
-    conn.close()
+    db.release(conn)
 
     sites = get_sites()
 
@@ -584,5 +721,6 @@ def admin_dashboard():
 
 
 # ---- RUN SERVER ----
+# Development only; production serves asgi:app under uvicorn (see asgi.py)
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=81)
@@ -0,0 +1,85 @@
+import sqlite3
+
+from db import DATABASE
+
+# (version, description, statements) - append new entries, never edit applied ones
+MIGRATIONS = [
+    (1, "teams and scores", [
+        """
+        CREATE TABLE IF NOT EXISTS teams (
+            name TEXT PRIMARY KEY,
+            password TEXT,
+            site_id INTEGER DEFAULT 1
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            score INTEGER,
+            duration INTEGER,
+            site_id INTEGER
+        )
+        """,
+    ]),
+    (2, "submission history and per-bug results", [
+        """
+        CREATE TABLE IF NOT EXISTS submissions (
+            id TEXT PRIMARY KEY,
+            team TEXT NOT NULL,
+            site_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            fixed_bugs INTEGER NOT NULL,
+            total_bugs INTEGER NOT NULL,
+            duration INTEGER,
+            plan_version TEXT,
+            file_hashes TEXT,
+            elapsed_ms REAL,
+            created_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS submission_bug_results (
+            submission_id TEXT NOT NULL REFERENCES submissions(id) ON DELETE CASCADE,
+            bug_id TEXT NOT NULL,
+            site_id INTEGER NOT NULL,
+            fixed INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            PRIMARY KEY (submission_id, bug_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_submissions_team_created ON submissions (team, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_bug_results_site_bug ON submission_bug_results (site_id, bug_id)",
+    ]),
+    (3, "submission time of each team's current score", [
+        "ALTER TABLE scores ADD COLUMN submitted_at TEXT",
+    ]),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path=DATABASE):
+    """Apply every pending migration in order; returns the resulting version"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        current = schema_version(conn)
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            with conn:
+                for statement in statements:
+                    conn.execute(statement)
+                # PRAGMA can't take parameters; version is a trusted int
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+            print(f"Applied migration {version}: {description}")
+            current = version
+        return current
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    print(f"Database schema at version {migrate()}")
@@ -0,0 +1,125 @@
+"""Formatting-insensitive form of submission files and bug snippets.
+
+Teams often run a formatter (Prettier) before zipping, after which a
+multi-line original such as "</div>\\n    <!-- Spinner End -->" no longer
+appears byte for byte. In the "normalized" scoring engine every file is
+normalised once and the substring checks run against that text, with
+bug needles normalised the same way when the plan is compiled:
+
+    whitespace runs                           one space
+    whitespace next to < > { } ; : , = ( )    removed
+    leading and trailing whitespace           removed
+    ' quotes                                  " quotes
+    tag names, <!DOCTYPE                      lower case
+    self-closing />                           >
+
+A bug whose needles only differ in what normalisation removes (the
+extra_space "< div" or the self_closing "<br />") keeps its check on the
+raw text; see merges_needles().
+
+Each step is a C-level str/re pass over the whole file. The offset map
+back into the original text is only needed to report positions, so it
+is built the first time it is asked for.
+"""
+
+import re
+from bisect import bisect_right
+
+# A single space (runs are already collapsed) before or after punctuation. Both
+# branches start with the space so re can skip ahead to candidates, and the
+# replacement is a plain '', which re applies without calling back into Python
+PUNCTUATION = '<>{};:,=()'
+PUNCTUATION_SPACE_RE = re.compile(r' (?:(?=[<>{};:,=()])|(?<=[<>{};:,=()] ))')
+UPPERCASE_TAG_RE = re.compile(r'</?!?[a-z0-9-]*[A-Z][\w-]*')
+
+
+def normalize(text):
+    """Normalised form of a file or snippet"""
+    text = ' '.join(text.split())
+    text = PUNCTUATION_SPACE_RE.sub('', text)
+    text = text.replace("'", '"').replace(' />', '>').replace('/>', '>')
+    if UPPERCASE_TAG_RE.search(text):
+        text = UPPERCASE_TAG_RE.sub(lambda m: m.group(0).lower(), text)
+    return text
+
+
+def normalize_needle(needle):
+    """Normalised form of a bug needle
+
+    Whitespace at either end stays as one space unless it touches
+    punctuation: "color " (a missing colon) must not match "color:".
+    """
+    normalized = normalize(needle)
+    if not normalized:
+        return ' ' if needle[:1].isspace() else normalized
+    if needle[0].isspace() and normalized[0] not in PUNCTUATION:
+        normalized = ' ' + normalized
+    if needle[-1].isspace() and normalized[-1] not in PUNCTUATION:
+        normalized += ' '
+    return normalized
+
+
+def merges_needles(needles):
+    """True if normalising makes one needle equal to, or part of, another
+
+    "< div" and "<div", or "<br />" and "<br>", differ only in what
+    normalisation removes; a check telling them apart must see raw text.
+    """
+    pairs = [(needle, normalize_needle(needle)) for needle in dict.fromkeys(needles) if needle]
+    return any(a != b and (na == nb or (na in nb and a not in b))
+               for a, na in pairs for b, nb in pairs)
+
+
+def normalized_needles(needles):
+    """{needle: normalised needle} for a plan's needles"""
+    return {needle: normalize_needle(needle) for needle in needles}
+
+
+def _same(original, normalized):
+    if original == normalized:
+        return True
+    if normalized == ' ':
+        return original.isspace()
+    return original.lower() == normalized or (original == "'" and normalized == '"')
+
+
+class NormalizedText:
+    """A file's normalised text and the way back to original offsets"""
+
+    __slots__ = ('original', 'text', '_starts', '_offsets')
+
+    def __init__(self, original):
+        self.original = original
+        self.text = normalize(original)
+        self._starts = None
+        self._offsets = None
+
+    def _build_map(self):
+        # normalize() only drops characters (whitespace, the "/" of "/>") or
+        # replaces them one for one, so a greedy walk lines the two texts up.
+        # Stored as runs of consecutive offsets: (normalised start, original start)
+        original = self.original
+        starts, offsets = [], []
+        i = 0
+        previous = None
+        for pos, ch in enumerate(self.text):
+            while not _same(original[i], ch):
+                i += 1
+            if previous is None or i != previous + 1:
+                starts.append(pos)
+                offsets.append(i)
+            previous = i
+            i += 1
+        self._starts, self._offsets = starts, offsets
+
+    def original_offset(self, pos):
+        """Offset in the original text of the character at `pos` of the normalised text"""
+        if self._starts is None:
+            self._build_map()
+        run = bisect_right(self._starts, pos) - 1
+        return self._offsets[run] + pos - self._starts[run]
+
+    def locate(self, needle):
+        """Original offset of a normalised needle's first match, or -1"""
+        pos = self.text.find(needle)
+        return -1 if pos < 0 else self.original_offset(pos)
@@ -1,34 +1,23 @@
 
 import sqlite3
 import os
+from db import DATABASE
+from migrations import migrate
 
 # ✅ Clean old DB
-if os.path.exists('database.db'):
-    os.remove('database.db')
+if os.path.exists(DATABASE):
+    os.remove(DATABASE)
     print("🧹 Old database removed.")
+# WAL mode leaves these next to the database; a stale WAL must not replay into the new file
+for suffix in ('-wal', '-shm'):
+    if os.path.exists(DATABASE + suffix):
+        os.remove(DATABASE + suffix)
 
-# ✅ Create new DB
-conn = sqlite3.connect('database.db')
-c = conn.cursor()
+# ✅ Create new DB at the latest schema version
+migrate(DATABASE)
 
-# Create tables
-c.execute("""
-CREATE TABLE teams (
-    name TEXT PRIMARY KEY,
-    password TEXT,
-    site_id INTEGER DEFAULT 1
-)
-""")
-
-c.execute("""
-CREATE TABLE scores (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT UNIQUE,
-    score INTEGER,
-    duration INTEGER,
-    site_id INTEGER
-)
-""")
+conn = sqlite3.connect(DATABASE)
+c = conn.cursor()
 
 # Insert example teams for testing (as mentioned in requirements)
 c.execute("INSERT INTO teams (name, password, site_id) VALUES (?, ?, ?)", ("TeamAlpha", "alpha123", 1))
@@ -0,0 +1,80 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import bug_plan
+from bug_plan import run_file, merge_file_results
+
+SCORE_CACHE_SIZE = int(os.environ.get('SCORE_CACHE_SIZE', 512))
+
+
+def content_hash(text):
+    """SHA-256 of a submission file's text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ScoreCache:
+    """Bounded LRU of per-file bug results
+
+    Keyed by (site_id, bug log version, file, SHA-256 of the file), so a
+    resubmission only re-verifies files whose content changed. Keys are
+    content-addressed, which makes entries safe to share between teams.
+    """
+
+    def __init__(self, maxsize=SCORE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key, results):
+        with self._lock:
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {"size": len(self._entries), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses}
+
+
+score_cache = ScoreCache()
+
+
+def cached_run_plan(plan, contents, cache=score_cache, engine=None):
+    """run_plan() that reuses cached results for unchanged files
+
+    Returns (fixed flags in plan order, {file: sha256}).
+    """
+    # Looked up per call so the engine can be switched at runtime (benchmarks)
+    engine = engine or bug_plan.SCORING_ENGINE
+    file_results = {}
+    hashes = {}
+    for file in plan.files:
+        text = contents.get(file, "")
+        hashes[file] = content_hash(text)
+        key = (plan.site_id, plan.version, engine, file, hashes[file])
+        results = cache.get(key)
+        if results is None:
+            results = run_file(plan, file, text, engine)
+            cache.put(key, results)
+        file_results[file] = results
+    return merge_file_results(plan, file_results), hashes
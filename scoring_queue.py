@@ -0,0 +1,219 @@
+import io
+import os
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from bug_rules import score_zip_submission
+
+QUEUE_DB = os.environ.get('SCORING_QUEUE_DB', 'scoring_queue.db')
+SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', os.cpu_count() or 2))
+WORKER_CRASHED = 'Scoring worker crashed, please resubmit'
+
+
+def score_payload(payload, site_id, team=None):
+    """Score raw ZIP bytes into a ScoreResult; runs inside a pool worker process"""
+    return score_zip_submission(io.BytesIO(payload), site_id, team)
+
+
+class SQLiteQueueBackend:
+    """Durable job queue stored in a local SQLite file
+
+    Any backend exposing enqueue/claim/complete/fail/get/requeue_running
+    can be registered in QUEUE_BACKENDS.
+    """
+
+    def __init__(self, path=QUEUE_DB):
+        self.path = path
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                team TEXT NOT NULL,
+                site_id INTEGER NOT NULL,
+                time_taken INTEGER NOT NULL,
+                payload BLOB,
+                status TEXT NOT NULL DEFAULT 'queued',
+                score INTEGER,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                finished_at TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def enqueue(self, team, site_id, time_taken, payload):
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO jobs (id, team, site_id, time_taken, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, team, site_id, time_taken, payload, datetime.now().isoformat()))
+        conn.close()
+        return job_id
+
+    def claim(self):
+        """Atomically move the oldest queued job to running and return it"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, team, site_id, time_taken, payload, created_at FROM jobs "
+                "WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+            if row:
+                conn.execute("UPDATE jobs SET status = 'running' WHERE id = ?", (row[0],))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        if not row:
+            return None
+        # created_at is the enqueue time; it orders a team's submissions however they finish
+        return {'id': row[0], 'team': row[1], 'site_id': row[2], 'time_taken': row[3], 'payload': row[4],
+                'submitted_at': row[5]}
+
+    def _finish(self, job_id, status, score, error):
+        conn = self._connect()
+        conn.execute(
+            "UPDATE jobs SET status = ?, score = ?, error = ?, payload = NULL, finished_at = ? WHERE id = ?",
+            (status, score, error, datetime.now().isoformat(), job_id))
+        conn.close()
+
+    def complete(self, job_id, result):
+        self._finish(job_id, 'done', result.score, None)
+
+    def fail(self, job_id, error):
+        self._finish(job_id, 'failed', None, error)
+
+    def get(self, job_id):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT id, team, site_id, time_taken, status, score, error FROM jobs WHERE id = ?",
+            (job_id,)).fetchone()
+        conn.close()
+        if not row:
+            return None
+        keys = ('id', 'team', 'site_id', 'time_taken', 'status', 'score', 'error')
+        return dict(zip(keys, row))
+
+    def requeue_running(self):
+        """Put jobs interrupted by a restart back in the queue"""
+        conn = self._connect()
+        conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+        conn.close()
+
+
+QUEUE_BACKENDS = {
+    'sqlite': SQLiteQueueBackend,
+}
+
+
+class ScoringService:
+    """Accepts submissions into a queue and scores them in a process pool"""
+
+    def __init__(self, backend, on_scored=None, workers=SCORING_WORKERS):
+        self.backend = backend
+        self.on_scored = on_scored
+        self.workers = max(1, workers)
+        self._pool = None
+        self._wakeup = threading.Event()
+        self._slots = threading.Semaphore(self.workers)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the pool and dispatcher once; safe to call on every request"""
+        with self._lock:
+            if self._pool is not None:
+                return
+            self.backend.requeue_running()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            threading.Thread(target=self._dispatch, name='scoring-dispatcher', daemon=True).start()
+
+    def submit(self, team, site_id, time_taken, payload):
+        job_id = self.backend.enqueue(team, site_id, time_taken, payload)
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def status(self, job_id):
+        return self.backend.get(job_id)
+
+    def _dispatch(self):
+        while True:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+            try:
+                self._dispatch_queued()
+            except Exception as e:
+                # Keep the dispatcher alive; queued jobs are retried on the next wakeup
+                print(f"Error dispatching scoring jobs: {e}")
+
+    def _dispatch_queued(self):
+        while self._slots.acquire(blocking=False):
+            try:
+                job = self.backend.claim()
+            except Exception:
+                self._slots.release()
+                raise
+            if job is None:
+                self._slots.release()
+                break
+            try:
+                pool, future = self._submit(job, job.pop('payload'))
+            except Exception as e:
+                print(f"Error scoring submission {job['id']}: {e}")
+                self.backend.fail(job['id'], str(e))
+                self._slots.release()
+                continue
+            future.add_done_callback(lambda f, job=job, pool=pool: self._finished(job, pool, f))
+
+    def _submit(self, job, payload):
+        pool = self._pool
+        try:
+            return pool, pool.submit(score_payload, payload, job['site_id'], job['team'])
+        except RuntimeError:
+            # Broken by a dead worker or already replaced; this job never ran, so it gets the new pool
+            self._replace_pool(pool)
+            pool = self._pool
+            return pool, pool.submit(score_payload, payload, job['site_id'], job['team'])
+
+    def _replace_pool(self, pool):
+        """Swap a pool whose worker died (OOM, crash) for a fresh one"""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            print("Scoring worker died; starting a new process pool")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, job, pool, future):
+        try:
+            result = future.result()
+            if self.on_scored:
+                self.on_scored(job, result)
+            self.backend.complete(job['id'], result)
+        except BrokenProcessPool as e:
+            # The job may have killed the worker itself, so it fails rather than
+            # going back in the queue; the team can resubmit
+            self._replace_pool(pool)
+            print(f"Error scoring submission {job['id']}: {e}")
+            self.backend.fail(job['id'], WORKER_CRASHED)
+        except Exception as e:
+            print(f"Error scoring submission {job['id']}: {e}")
+            self.backend.fail(job['id'], str(e))
+        finally:
+            self._slots.release()
+            self._wakeup.set()
+
+
+def create_scoring_service(on_scored=None):
+    """Build the scoring service from SCORING_QUEUE_BACKEND / SCORING_WORKERS"""
+    backend_cls = QUEUE_BACKENDS[os.environ.get('SCORING_QUEUE_BACKEND', 'sqlite')]
+    return ScoringService(backend_cls(), on_scored=on_scored)
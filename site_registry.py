@@ -0,0 +1,136 @@
+import os
+import copy
+import json
+import tempfile
+import threading
+
+SITES_FILE = os.path.join('admin', 'sites.json')
+
+# Template folder mapping for your actual template names
+TEMPLATE_FOLDERS = {
+    1: 'drinking-water-website-template',
+    2: 'mobile-app-html-template',
+    3: 'online-shop-website-template',
+    4: 'seo-agency-website-template',
+    5: 'stock-market-website-template'
+}
+
+DEFAULT_BUGS_COUNT = 30
+
+# Schema of one entry in admin/sites.json: field -> (type, required)
+SITE_SCHEMA = {
+    'name': (str, True),
+    'template_folder': (str, False),
+    # Clean copy of the template; per-team variants are generated from it (variants.py)
+    'clean_template': (str, False),
+    'type': (str, False),
+    'drive_link': (str, False),
+    'description': (str, False),
+    'bugs_count': (int, False),
+    'qr_path': (str, False),
+}
+
+
+class SiteConfigError(ValueError):
+    """admin/sites.json does not match SITE_SCHEMA"""
+
+
+def validate_sites(data):
+    """Check a parsed sites.json; raises SiteConfigError listing every problem"""
+    if not isinstance(data, dict):
+        raise SiteConfigError("sites.json must be an object keyed by site ID")
+
+    errors = []
+    for site_id, site in data.items():
+        if not str(site_id).isdigit():
+            errors.append(f"site ID {site_id!r} is not a number")
+        if not isinstance(site, dict):
+            errors.append(f"site {site_id}: entry must be an object")
+            continue
+        for field, (field_type, required) in SITE_SCHEMA.items():
+            if field not in site:
+                if required:
+                    errors.append(f"site {site_id}: missing '{field}'")
+            elif not isinstance(site[field], field_type) or isinstance(site[field], bool):
+                errors.append(f"site {site_id}: '{field}' must be {field_type.__name__}")
+    if errors:
+        raise SiteConfigError("; ".join(errors))
+
+
+class SiteRegistry:
+    """admin/sites.json, parsed and validated once and cached until the file changes"""
+
+    def __init__(self, path=SITES_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._stamp = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _current(self):
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return self._sites
+        with self._lock:
+            if stamp is None:
+                self._sites = {}
+            else:
+                try:
+                    with open(self.path, 'r') as f:
+                        sites = json.load(f)
+                    validate_sites(sites)
+                    self._sites = sites
+                except (OSError, ValueError) as e:
+                    # Keep serving the last good config rather than dropping every site
+                    print(f"Error loading sites config {self.path}: {e}")
+            self._stamp = stamp
+            return self._sites
+
+    def all(self):
+        """Copy of every site entry keyed by site ID string (safe to modify)"""
+        return copy.deepcopy(self._current())
+
+    def get(self, site_id):
+        return self._current().get(str(site_id))
+
+    def exists(self, site_id):
+        return str(site_id) in self._current()
+
+    def name(self, site_id):
+        site = self.get(site_id) or {}
+        return site.get('name', TEMPLATE_FOLDERS.get(int(site_id), f'Site {site_id}'))
+
+    def template_folder(self, site_id, default=None):
+        site = self.get(site_id) or {}
+        return TEMPLATE_FOLDERS.get(int(site_id)) or site.get('template_folder') or default
+
+    def bug_count(self, site_id):
+        site = self.get(site_id) or {}
+        return site.get('bugs_count', DEFAULT_BUGS_COUNT)
+
+    def save(self, sites):
+        """Validate and atomically write the whole config, then refresh the cache"""
+        validate_sites(sites)
+        folder = os.path.dirname(self.path) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.sites-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(sites, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._sites = copy.deepcopy(sites)
+            self._stamp = self._file_stamp()
+
+
+registry = SiteRegistry()
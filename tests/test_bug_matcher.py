@@ -0,0 +1,89 @@
+import glob
+import json
+import os
+import random
+
+import pytest
+
+from bug_matcher import AhoCorasick
+from bug_plan import compile_plan, run_plan
+from bug_rules import verify_specific_bugs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUGGED_SITES = sorted(glob.glob(os.path.join(ROOT, 'templates', 'bugged_sites', 'site_*')))
+
+
+def load_plans():
+    plans = []
+    for path in sorted(glob.glob(os.path.join(ROOT, 'bug_packs', 'site_*.json'))):
+        with open(path, encoding='utf-8') as f:
+            pack = json.load(f)
+        plans.append(compile_plan(pack['site_id'], pack))
+    return plans
+
+
+PLANS = load_plans()
+
+
+def mismatches(plan, contents):
+    """Bugs the automaton engine scores differently from verify_specific_bugs()"""
+    automaton = run_plan(plan, contents, engine='automaton')
+    found = []
+    for check, fixed in zip(plan.checks, automaton):
+        _, expected = verify_specific_bugs(contents.get(check.file, ""), [check.bug])
+        if bool(expected) != fixed:
+            found.append(check.bug_id)
+    return found
+
+
+def bugged_site(folder):
+    contents = {}
+    for path in sorted(glob.glob(os.path.join(folder, '*.html')) + glob.glob(os.path.join(folder, '*.css'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            key = 'index.html' if path.endswith('.html') else 'css/style.css'
+            contents[key] = contents.get(key, "") + f.read()
+    return contents
+
+
+def random_site(plan, rnd):
+    """Mix originals, bugged variants and both, so every checker branch is exercised"""
+    pieces = {file: [] for file in plan.files}
+    for check in plan.checks:
+        original = check.bug.get("original", "")
+        modified = check.bug.get("modified", "")
+        pieces[check.file].append(rnd.choice([original, modified, original + modified, modified * 2, ""]))
+    contents = {}
+    for file, parts in pieces.items():
+        rnd.shuffle(parts)
+        contents[file] = rnd.choice([" ", "\n", ""]).join(parts)
+    return contents
+
+
+def test_matcher_counts_like_str_count():
+    matcher = AhoCorasick(['aa', 'a', 'ab', 'b', ''])
+    text = 'aaab aab abab'
+    assert matcher.scan(text) == {needle: text.count(needle) for needle in ['aa', 'a', 'ab', 'b']}
+
+
+def test_matcher_built_on_first_scan():
+    plan = PLANS[0]
+    assert plan.matcher._delta is None
+    run_plan(plan, {}, engine='substring')
+    assert plan.matcher._delta is None
+    run_plan(plan, {}, engine='automaton')
+    assert plan.matcher._delta is not None
+
+
+@pytest.mark.parametrize('folder', BUGGED_SITES, ids=os.path.basename)
+def test_automaton_matches_on_bugged_templates(folder):
+    contents = bugged_site(folder)
+    for plan in PLANS:
+        assert mismatches(plan, contents) == [], f"site {plan.site_id}"
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_automaton_matches_on_random_sites(seed):
+    rnd = random.Random(seed)
+    for trial in range(30):
+        plan = rnd.choice(PLANS)
+        assert mismatches(plan, random_site(plan, rnd)) == [], f"site {plan.site_id}, trial {trial}"
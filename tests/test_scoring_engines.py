@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from bug_plan import ENGINES, compile_plan, run_plan
+
+BUG_PACK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bug_packs')
+
+
+def site_plan(site_id):
+    with open(os.path.join(BUG_PACK_DIR, f'site_{site_id}.json'), encoding='utf-8') as f:
+        return compile_plan(site_id, json.load(f))
+
+
+def fixed(plan, bug_id, text, engine):
+    """Whether one bug scores fixed when its file holds `text`"""
+    index = [check.bug_id for check in plan.checks].index(bug_id)
+    return run_plan(plan, {plan.checks[index].file: text}, engine)[index]
+
+
+# HTML-003 of site 1 deletes "</div>"; the buggy text is part of the fixed one
+SPINNER_FIXED = [
+    '<div>\n</div>\n    <!-- Spinner End -->',
+    '<div>\n  </div>\n  <!-- Spinner End -->',  # reformatted by Prettier
+]
+SPINNER_BUGGED = '<div>\n    <!-- Spinner End -->'
+
+
+@pytest.mark.parametrize('text', SPINNER_FIXED)
+def test_deleted_closing_tag_fixed_under_normalized(text):
+    assert fixed(site_plan(1), 'HTML-003', text, 'normalized')
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_deleted_closing_tag_exact_fix(engine):
+    plan = site_plan(1)
+    assert fixed(plan, 'HTML-003', SPINNER_FIXED[0], engine)
+    assert not fixed(plan, 'HTML-003', SPINNER_BUGGED, engine)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_stray_copy_of_deleted_text_is_unfixed(engine):
+    # One spinner fixed, a second still missing its "</div>"
+    text = SPINNER_FIXED[0] + '\n<div>\n    <!-- Spinner End -->'
+    assert not fixed(site_plan(1), 'HTML-003', text, engine)
@@ -0,0 +1,143 @@
+import os
+import io
+import time
+import struct
+import zipfile
+import threading
+
+# Whole request body, enforced by Flask before the upload is read
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+# Limits checked against the ZIP's central directory before any member is inflated
+MAX_MEMBERS = int(os.environ.get('MAX_ZIP_MEMBERS', 500))
+MAX_UNCOMPRESSED_BYTES = int(os.environ.get('MAX_UNCOMPRESSED_BYTES', 50 * 1024 * 1024))
+MAX_COMPRESSION_RATIO = int(os.environ.get('MAX_COMPRESSION_RATIO', 100))
+# Small members may compress very well and are harmless under the total limit
+RATIO_CHECK_MIN_BYTES = 1024 * 1024
+
+EOCD_SIGNATURE = b'PK\x05\x06'
+EOCD_SIZE = 22
+EOCD_SEARCH = EOCD_SIZE + 0xFFFF  # record plus the longest possible comment
+
+
+class SubmissionRejected(ValueError):
+    """An upload failed validation; `reason` is a short metrics key"""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+class UploadMetrics:
+    """Counters and timings for submission validation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = {}
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms, reason=None):
+        with self._lock:
+            if reason is None:
+                self.accepted += 1
+            else:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            checked = self.accepted + sum(self.rejected.values())
+            return {
+                "accepted": self.accepted,
+                "rejected": dict(self.rejected),
+                "checked": checked,
+                "avg_ms": round(self.total_ms / checked, 3) if checked else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "limits": {
+                    "max_upload_bytes": MAX_UPLOAD_BYTES,
+                    "max_members": MAX_MEMBERS,
+                    "max_uncompressed_bytes": MAX_UNCOMPRESSED_BYTES,
+                    "max_compression_ratio": MAX_COMPRESSION_RATIO,
+                },
+            }
+
+
+upload_metrics = UploadMetrics()
+
+
+def declared_member_count(data):
+    """Entry count from the end-of-central-directory record, without parsing the directory
+
+    The client writes this number, so it only serves as a cheap early
+    reject; the parsed directory is counted as well.
+    """
+    start = data.rfind(EOCD_SIGNATURE, max(0, len(data) - EOCD_SEARCH))
+    if start < 0 or len(data) - start < EOCD_SIZE:
+        raise SubmissionRejected('not_zip', "Uploaded file is not a valid ZIP archive")
+    return struct.unpack('<H', data[start + 10:start + 12])[0]
+
+
+def unsafe_path(name):
+    """True if extracting `name` could write outside the target folder"""
+    path = name.replace('\\', '/')
+    if path.startswith('/') or (len(path) > 1 and path[1] == ':'):
+        return True
+    return '..' in path.split('/')
+
+
+def _check_archive(data):
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise SubmissionRejected('too_large', f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+
+    # ZIP64 archives report 0xFFFF here, which is also over any sane limit
+    if declared_member_count(data) > MAX_MEMBERS:
+        raise SubmissionRejected('too_many_members', f"ZIP has more than {MAX_MEMBERS} files")
+
+    try:
+        zip_ref = zipfile.ZipFile(io.BytesIO(data))
+    except (zipfile.BadZipFile, ValueError, EOFError):
+        raise SubmissionRejected('not_zip', "Uploaded file is not a valid ZIP archive")
+    if len(zip_ref.infolist()) > MAX_MEMBERS:
+        zip_ref.close()
+        raise SubmissionRejected('too_many_members', f"ZIP has more than {MAX_MEMBERS} files")
+
+    seen = set()
+    total = 0
+    with zip_ref:
+        # Every member is checked: with duplicate names zipfile reads the last one,
+        # so no entry can be skipped as irrelevant to scoring
+        for info in zip_ref.infolist():
+            if info.filename in seen:
+                raise SubmissionRejected('duplicate_member', f"Duplicate file in ZIP: {info.filename}")
+            seen.add(info.filename)
+            if unsafe_path(info.filename):
+                raise SubmissionRejected('path_traversal', f"Unsafe path in ZIP: {info.filename}")
+            if info.flag_bits & 0x1:
+                raise SubmissionRejected('encrypted', "Encrypted ZIP files are not supported")
+
+            total += info.file_size
+            if total > MAX_UNCOMPRESSED_BYTES:
+                raise SubmissionRejected('too_large_uncompressed',
+                                         f"ZIP expands to more than {MAX_UNCOMPRESSED_BYTES // (1024 * 1024)} MB")
+            if (info.file_size > RATIO_CHECK_MIN_BYTES
+                    and info.file_size > MAX_COMPRESSION_RATIO * max(info.compress_size, 1)):
+                raise SubmissionRejected('compression_ratio', f"Suspicious compression ratio for {info.filename}")
+
+
+def validate_submission(data):
+    """Reject oversized, bomb-like or unsafe ZIP uploads from metadata alone
+
+    Only the end-of-central-directory record and the central directory are
+    read; no member is decompressed. Raises SubmissionRejected.
+    """
+    started = time.perf_counter()
+    try:
+        _check_archive(data)
+    except SubmissionRejected as e:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        upload_metrics.record(elapsed_ms, e.reason)
+        print(f"Rejected upload ({e.reason}) in {elapsed_ms:.2f} ms: {e}")
+        raise
+    upload_metrics.record((time.perf_counter() - started) * 1000)
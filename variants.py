@@ -0,0 +1,194 @@
+"""Per-team site variants: each team gets its own bug placements.
+
+A site opts in by naming a clean copy of its template in admin/sites.json
+("clean_template"). Each team's seed is derived from its name, the site
+and a secret, so a variant can always be rebuilt. The secret comes from
+VARIANT_SECRET, or is generated on first use and kept in
+build/variant_secret (VARIANT_SECRET_FILE); deleting that file changes
+every team's seed. It is generated
+with bug_injector on first use (the team's first /download_site, or its
+first submission) and kept under build/variants/site_<id>/<seed>/: the
+site files in files/, which is what the team downloads, and the bug pack
+next to them. Variants are not rebuilt when the clean template changes;
+delete build/variants/site_<id>/ after editing one.
+
+Compiled plans for variants sit in a bounded LRU, so scoring stays one
+dictionary lookup per submission however many teams there are. Each entry
+records its pack file's mtime, size and inode, and is dropped once the
+variant is deleted or rebuilt.
+"""
+
+import os
+import json
+import hashlib
+import secrets
+import tempfile
+import threading
+from collections import OrderedDict
+
+from bug_injector import InjectionError, inject_bugs, write_site
+from bug_pack import validate_pack, write_pack, pack_path
+from bug_plan import compile_plan
+from site_registry import registry as site_registry
+
+VARIANT_FOLDER = os.environ.get('VARIANT_FOLDER', os.path.join('build', 'variants'))
+VARIANT_SECRET = os.environ.get('VARIANT_SECRET')
+VARIANT_SECRET_FILE = os.environ.get('VARIANT_SECRET_FILE', os.path.join('build', 'variant_secret'))
+VARIANT_PLAN_CACHE_SIZE = int(os.environ.get('VARIANT_PLAN_CACHE_SIZE', 256))
+
+_secret = VARIANT_SECRET
+_secret_lock = threading.Lock()
+
+
+def _create_secret_file(path):
+    """Write a fresh secret to path unless another process got there first"""
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.secret-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32) + '\n')
+        # link() fails if the file exists, so concurrent workers all end up with one secret
+        os.link(tmp_path, path)
+        print(f"Generated a new variant secret in {path}")
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+
+
+def variant_secret():
+    """VARIANT_SECRET, or the secret stored in VARIANT_SECRET_FILE (created on first use)"""
+    global _secret
+    with _secret_lock:
+        if not _secret:
+            if not os.path.exists(VARIANT_SECRET_FILE):
+                _create_secret_file(VARIANT_SECRET_FILE)
+            with open(VARIANT_SECRET_FILE, 'r', encoding='utf-8') as f:
+                _secret = f.read().strip()
+        return _secret
+
+
+def team_seed(team_name, site_id):
+    """Stable per-team seed; other teams cannot derive it without the variant secret"""
+    key = f"{variant_secret()}\0{site_id}\0{team_name}".encode('utf-8')
+    return hashlib.sha256(key).hexdigest()[:16]
+
+
+def _pack_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def clean_template(site_id):
+    """Clean template directory a site's variants are generated from, or None"""
+    site = site_registry.get(site_id) or {}
+    folder = site.get('clean_template')
+    return folder if folder and os.path.isdir(folder) else None
+
+
+class VariantStore:
+    """Builds variants on demand and caches their plans"""
+
+    def __init__(self, folder=VARIANT_FOLDER, plan_cache_size=VARIANT_PLAN_CACHE_SIZE):
+        self.folder = folder
+        self.plan_cache_size = plan_cache_size
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._plans = OrderedDict()
+        # (site_id, seed) pairs whose template could not take a full set of bugs
+        self._failed = set()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def variant_dir(self, site_id, seed):
+        return os.path.join(self.folder, f'site_{site_id}', seed)
+
+    def files_dir(self, site_id, seed):
+        """Folder holding the files a team downloads for its variant"""
+        return os.path.join(self.variant_dir(site_id, seed), 'files')
+
+    def _build_lock(self, key):
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def ensure(self, site_id, team_name):
+        """(seed, variant folder) for a team, generating the variant if needed
+
+        Returns None when the site has no clean template, or the injector
+        cannot place a full set of bugs for this seed (the team then shares
+        the site's bugged template and bug pack).
+        """
+        template = clean_template(site_id)
+        if template is None:
+            return None
+        seed = team_seed(team_name, site_id)
+        folder = self.variant_dir(site_id, seed)
+        if os.path.exists(pack_path(site_id, folder)):
+            return seed, folder
+        if (site_id, seed) in self._failed:
+            return None
+
+        with self._build_lock((site_id, seed)):
+            if not os.path.exists(pack_path(site_id, folder)):
+                site = site_registry.get(site_id) or {}
+                try:
+                    result = inject_bugs(template, seed, site_id,
+                                         template_name=site.get('template_folder') or os.path.basename(template))
+                except InjectionError as e:
+                    self._failed.add((site_id, seed))
+                    print(f"Could not generate variant {seed} of site {site_id} for {team_name}, "
+                          f"using the shared template: {e}")
+                    return None
+                write_site(template, self.files_dir(site_id, seed), result.files)
+                # The pack is written last: its presence marks a complete variant
+                write_pack(result.pack, folder)
+                self.builds += 1
+                print(f"Generated variant {seed} of site {site_id} for {team_name} "
+                      f"in {result.seconds * 1000:.1f} ms")
+        return seed, folder
+
+    def plan(self, site_id, team_name):
+        """Compiled plan for a team's variant, or None if the site has no variants"""
+        seed = team_seed(team_name, site_id)
+        key = (int(site_id), seed)
+        path = pack_path(site_id, self.variant_dir(site_id, seed))
+        stamp = _pack_stamp(path)
+        with self._lock:
+            cached = self._plans.get(key)
+            if cached is not None:
+                if cached[0] == stamp:
+                    self._plans.move_to_end(key)
+                    self.hits += 1
+                    return cached[1]
+                # Deleted or rebuilt since it was compiled
+                del self._plans[key]
+
+        variant = self.ensure(site_id, team_name)
+        if variant is None:
+            return None
+        stamp = _pack_stamp(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            pack = json.load(f)
+        validate_pack(pack, int(site_id))
+        plan = compile_plan(int(site_id), pack)
+
+        with self._lock:
+            self.misses += 1
+            self._plans[key] = (stamp, plan)
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+        return plan
+
+    def stats(self):
+        with self._lock:
+            return {"plans": len(self._plans), "max_plans": self.plan_cache_size,
+                    "hits": self.hits, "misses": self.misses, "builds": self.builds}
+
+
+variants = VariantStore()
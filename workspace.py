@@ -0,0 +1,60 @@
+import os
+import re
+import shutil
+import hashlib
+import zipfile
+import tempfile
+
+UPLOAD_FOLDER = 'uploads'
+
+
+def _team_slug(team_name):
+    """Make a team name safe to use as a directory name"""
+    slug = re.sub(r'[^A-Za-z0-9_.-]', '_', team_name).strip('.')
+    digest = hashlib.sha1(team_name.encode('utf-8')).hexdigest()[:8]
+    return f"{slug or 'team'}-{digest}"
+
+
+def team_folder(team_name):
+    """Directory that holds every submission workspace of a team"""
+    return os.path.join(UPLOAD_FOLDER, _team_slug(team_name))
+
+
+def submission_id_for(data):
+    """Content-addressed submission id for the raw ZIP bytes"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def create_workspace(team_name, data):
+    """Extract a submission into uploads/<team>/<submission_id>/
+
+    The archive is extracted into a private temp directory first and then
+    renamed into place, so a concurrent reader never sees a half-written
+    workspace and two teams never share a directory.
+    Returns (submission_id, workspace_path).
+    """
+    folder = team_folder(team_name)
+    os.makedirs(folder, exist_ok=True)
+
+    submission_id = submission_id_for(data)
+    workspace = os.path.join(folder, submission_id)
+
+    if not os.path.isdir(workspace):
+        tmp_dir = tempfile.mkdtemp(dir=folder, prefix='.incoming-')
+        try:
+            zip_path = os.path.join(tmp_dir, 'submission.zip')
+            with open(zip_path, 'wb') as f:
+                f.write(data)
+            extract_dir = os.path.join(tmp_dir, 'files')
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                zip_ref.extractall(extract_dir)
+            try:
+                os.rename(extract_dir, workspace)
+            except OSError:
+                # Identical content was placed by a concurrent request
+                if not os.path.isdir(workspace):
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return submission_id, workspace